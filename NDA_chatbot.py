@@ -1,41 +1,131 @@
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
-import json
-import requests
+import hashlib
+import uuid
 import warnings
+from collections import deque
 warnings.filterwarnings('ignore')
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_community.vectorstores import FAISS  # Changed from Chroma to FAISS
-#from langchain.embeddings.openai import OpenAIEmbeddings
-from langchain_openai import ChatOpenAI
-
-from langchain.chains.summarize import load_summarize_chain
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.chains import RetrievalQA
-from langchain.memory import ConversationBufferWindowMemory
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain.prompts import ChatPromptTemplate,PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from chunk_store import ChunkStore
+from compliance_matrix import checklist_instructions, parse_compliance_response, to_row
+from conversation_store import ConversationStore
+from degradation import DeadlineRunner, classify_intent_locally
+from clause_splitter import get_token_counter, split_into_clauses
+from retrieval import (
+    COMPRESSION_TOKEN_BUDGET,
+    FULL_TEXT_TOKEN_BUDGET,
+    MMR_LAMBDA,
+    NUMPY_INDEX_MAX_CHUNKS,
+    choose_k,
+    compress_documents,
+    filter_by_relevance,
+    keyword_search,
+)
+from single_flight import SingleFlight
+
+# LangChain, OpenAI, FAISS and the PDF loader are imported lazily inside the
+# methods that need them, so importing this module (e.g. on every Streamlit
+# script start) stays cheap until an analyzer is actually used.
+# Profile with: python benchmarks/import_time.py
+
+# Shared by every analyzer in the process, so sessions opening the same NDA
+# at the same time wait on one computation instead of repeating it
+_single_flight = SingleFlight()
+
+# Per-stage deadlines and hedged retries; latencies are tracked process-wide,
+# since provider slowness affects every session alike
+_deadlines = DeadlineRunner()
+
+# Seconds a whole-document analysis (summary, legal analysis, compliance scoring)
+# may take; these run as background jobs, outside the chat stage deadlines
+ANALYSIS_TIMEOUT = float(os.getenv("NDA_ANALYSIS_TIMEOUT", 600))
+
+# Variable part of the document-level prompts when there is no conversation to take into account
+SUMMARY_REQUEST = "Summarize this NDA document."
+LEGAL_ANALYSIS_REQUEST = "Analyze this NDA document against Strada's requirements."
 
 class EnhancedNDAAnalyzer:
-    def __init__(self, openai_api_key: str, model_name: str = 'gpt-4o'):
+    def __init__(self, openai_api_key: str, model_name: str = 'gpt-4o',
+                 compress_context: bool = True,
+                 compression_token_budget: int = COMPRESSION_TOKEN_BUDGET,
+                 full_text_token_budget: int = FULL_TEXT_TOKEN_BUDGET,
+                 numpy_index_max_chunks: int = NUMPY_INDEX_MAX_CHUNKS,
+                 conversation_store: Optional[ConversationStore] = None,
+                 session_id: Optional[str] = None,
+                 memory_window: int = 10,
+                 stage_deadlines: Optional[Dict[str, float]] = None,
+                 chunk_store: Optional[ChunkStore] = None):
         """Initialize the enhanced NDA analyzer"""
+        from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+        self.model_name = model_name
+        # Optional local compression of retrieved chunks before the QA prompt
+        self.compress_context = compress_context
+        self.compression_token_budget = compression_token_budget
+        # NDAs up to this many tokens are answered from the full text, skipping embeddings
+        self.full_text_token_budget = full_text_token_budget
+        # Exact NumPy search up to this many chunks, FAISS above
+        self.numpy_index_max_chunks = numpy_index_max_chunks
+        # Seconds per stage (intent, retrieval, generation, index_build) before falling back
+        self.stage_deadlines = {**_deadlines.deadlines, **(stage_deadlines or {})}
+        # Client timeouts bound the attempts that are abandoned at a deadline;
+        # retries are left to the hedging in degradation.py
         self.llm = ChatOpenAI(
             openai_api_key=openai_api_key,
             model_name=model_name,
-            temperature=0.2
+            temperature=0.2,
+            timeout=self.stage_deadlines["generation"],
+            max_retries=1
+        )
+        # Long-running document analyses get their own client, so they aren't
+        # cut off by the chat generation deadline and may retry on transient errors
+        self.analysis_llm = ChatOpenAI(
+            openai_api_key=openai_api_key,
+            model_name=model_name,
+            temperature=0.2,
+            timeout=ANALYSIS_TIMEOUT,
+            max_retries=2
+        )
+        self.embeddings = OpenAIEmbeddings(
+            openai_api_key=openai_api_key,
+            request_timeout=self.stage_deadlines["index_build"],
+            max_retries=1
         )
-        self.embeddings = OpenAIEmbeddings(openai_api_key=openai_api_key)
         self.vectorstore = None
+        # Hash of the document whose index build outlived its deadline and is still running
+        self._index_building = None
+        self.qa_chain = None
+        self.chunks = None
+        self.document_tokens = None
         self.documents = None
+        self._document_text = None
         self.pdf_path = None
-        self.memory = ConversationBufferWindowMemory(
-            k=10,
-            return_messages=True,
-            memory_key="chat_history"
-        )
+        self.document_hash = None
+        self.document_id = None
+
+        # Prompt tokens sent vs. served from the provider's prefix cache (document-level prompts)
+        self.prompt_cache_stats = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0}
+        # Finished summaries and legal analyses, keyed like their single-flight calls
+        self._analysis_results: Dict[tuple, str] = {}
+        self._compliance_runnable = None
+
+        # Conversation memory lives in the store, keyed by (session_id, document_hash);
+        # only the last memory_window exchanges are loaded, lazily, on first use
+        self.conversation_store = conversation_store or ConversationStore(":memory:")
+        self.session_id = session_id or uuid.uuid4().hex
+        self.memory_window = memory_window
+        self._window = None
+
+        # Multi-document portfolio: one shared FAISS index, chunks tagged by doc_id
+        self.portfolio_documents: Dict[str, List[Any]] = {}
+        self.portfolio_chunk_ids: Dict[str, List[str]] = {}
+        self.portfolio_hashes: Dict[str, str] = {}
+        self.portfolio_vectorstore = None
+        # Vector ids of the loaded NDA in the portfolio index, once a cross-document query needed it
+        self._primary_portfolio_ids: Optional[List[str]] = None
+
+        # Interned chunk table, shareable across analyzers; chat responses reference sources by chunk id
+        self.chunk_store = chunk_store or ChunkStore()
 
         # Define all prompts
         self._setup_prompts()
@@ -68,7 +158,7 @@ class EnhancedNDAAnalyzer:
     def _setup_prompts(self):
         """Setup all prompt templates"""
 
-        # 1. Document Summary Prompt
+        # 1. Document Summary Prompt (system instructions; see _document_prompt)
         self.summary_prompt = '''You are a legal assistant specializing in NDA analysis. Provide a clear, structured summary of this NDA document.
 
 **Focus on these key elements:**
@@ -79,11 +169,9 @@ class EnhancedNDAAnalyzer:
 4. **Key Terms:** Duration, governing law, jurisdiction
 5. **Notable Features:** Any unusual or standard clauses
 
-**Format:** Use clear headings and bullet points. Keep it concise but comprehensive.
-
-Document: {text}'''
+**Format:** Use clear headings and bullet points. Keep it concise but comprehensive.'''
 
-        # 2. Legal Analysis Prompt (the one you provided earlier)
+        # 2. Legal Analysis Prompt (system instructions; see _document_prompt)
         self.legal_analysis_prompt = '''You are a legal document analyzer specializing in Non-Disclosure Agreements (NDAs) for a private equity firm called Strada. Your task is to thoroughly review NDAs and identify potential issues, missing clauses, and areas that require attention based on the firm's specific requirements.
 
 ## Analysis Framework
@@ -184,14 +272,14 @@ Document: {text}'''
 ### Legal Review Recommendation
 - Whether Phaedra (legal counsel) review is required
 - Specific items to discuss with legal team
-- Risk assessment
-
-Document: {text}'''
+- Risk assessment'''
 
         # 3. Q&A Prompt
         self.qa_prompt_template = """Use the following pieces of the NDA document to answer the question at the end.
 Focus on providing accurate information about confidentiality obligations, parties involved, terms, and legal provisions.
 
+Each excerpt is labelled with its section; cite the section numbers your answer relies on.
+
 If you don't know the answer based on the NDA content, just say that the information is not specified in this NDA.
 
 NDA Context:
@@ -201,8 +289,98 @@ Question: {question}
 
 Answer:"""
 
+        # 4. Compliance Scoring Prompt (one JSON row per NDA, for the compliance matrix)
+        self.compliance_prompt = """You are checking a Non-Disclosure Agreement against the checklist of the private equity firm Strada.
+For every checklist item, decide:
+- status: PASS, FAIL, or UNCLEAR if the document does not let you decide
+- page: the page number of the relevant clause, or null if there is none
+- value: the short extracted value where the item asks for one (e.g. "24 months", "Belgian law"), otherwise null
+- note: one short sentence explaining the status
+
+Checklist:
+{checklist}
+
+Respond with a JSON object only, in this shape:
+{{"items": {{"<item id>": {{"status": "PASS", "page": 3, "value": null, "note": "..."}}}}}}
+
+Document (pages marked [Page N]):
+{text}"""
+
+        # Compiled once and reused. Messages go from most to least stable: fixed
+        # instructions, then the document, then the request (with any conversation
+        # context), so the provider's prompt cache can reuse the longest prefix
+        # across requests on one NDA and the instructions across NDAs
+        self.summary_template = self._document_prompt(self.summary_prompt)
+        self.legal_analysis_template = self._document_prompt(self.legal_analysis_prompt)
+
+        # 5. Portfolio Q&A Prompt (cross-document)
+        self.portfolio_qa_prompt_template = """You are comparing several NDA documents signed by Strada.
+Use the following excerpts, each labelled with the NDA it comes from, to answer the question at the end.
+When the answer differs between NDAs, answer per NDA and name each document explicitly.
+
+If an NDA does not address the question, say that it is not specified in that NDA.
+
+NDA Excerpts:
+{context}
+
+Question: {question}
+
+Answer:"""
+
+    @staticmethod
+    def _document_prompt(instructions: str):
+        """System instructions -> document -> request, as a compiled chat template"""
+        from langchain_core.messages import SystemMessage
+        from langchain_core.prompts import ChatPromptTemplate
+
+        return ChatPromptTemplate.from_messages([
+            # A message object rather than a template, so the instructions are sent verbatim
+            SystemMessage(content=instructions),
+            ("human", "Document:\n{text}"),
+            ("human", "{request}"),
+        ])
+
+    def _get_document_text(self) -> str:
+        """The loaded pages joined once, so every document prompt sends byte-identical text"""
+        if self._document_text is None:
+            self._document_text = "\n\n".join(doc.page_content for doc in self.documents)
+        return self._document_text
+
+    def _run_document_prompt(self, template, request: str, llm: Any = None) -> str:
+        """Run a document-level prompt (default: on the analysis client) and record how much of it was served from the prompt cache"""
+        llm = llm or self.analysis_llm
+        message = (template | llm).invoke({"text": self._get_document_text(), "request": request})
+        self._record_prompt_cache(message)
+        return self._ensure_string_response(message.content)
+
+    def _record_prompt_cache(self, message: Any):
+        """Accumulate prompt and cached-prefix token counts from a chat response"""
+        usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        if not prompt_tokens:
+            # Newer langchain-openai versions report usage on usage_metadata instead
+            usage = getattr(message, "usage_metadata", None) or {}
+            prompt_tokens = usage.get("input_tokens") or 0
+            cached_tokens = (usage.get("input_token_details") or {}).get("cache_read") or 0
+
+        self.prompt_cache_stats["calls"] += 1
+        self.prompt_cache_stats["prompt_tokens"] += prompt_tokens
+        self.prompt_cache_stats["cached_tokens"] += cached_tokens
+        if prompt_tokens:
+            print(f"🧊 Prompt cache: {cached_tokens}/{prompt_tokens} prompt tokens cached")
+
+    def get_prompt_cache_stats(self) -> Dict[str, Any]:
+        """Prompt tokens sent by document-level prompts, and the share served from the provider's cache"""
+        stats = dict(self.prompt_cache_stats)
+        stats["hit_rate"] = stats["cached_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0
+        return stats
+
     def _setup_intent_classifier(self):
         """Setup intent classification system"""
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_core.output_parsers import StrOutputParser
+
         self.intent_classifier = ChatPromptTemplate.from_messages([
             ("system", """You are an intent classifier for an NDA analysis chatbot.
             Classify the user's message into one of these categories:
@@ -226,96 +404,249 @@ Answer:"""
         ])
         self.intent_chain = self.intent_classifier | self.llm | StrOutputParser()
 
-    def load_nda_document(self, pdf_path: str) -> bool:
-        """Load NDA PDF document"""
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        """Content hash identifying a document independently of its file name"""
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def load_nda_document(self, pdf_path: str, doc_id: Optional[str] = None) -> bool:
+        """Load NDA PDF document; doc_id names it in portfolio answers (default: the file name)"""
         try:
             print(f"📁 Loading NDA document: {pdf_path}")
+            from langchain_community.document_loaders import PyPDFLoader
             loader = PyPDFLoader(pdf_path)
-            self.documents = loader.load()
+            documents = loader.load()
+            # Let go of the previous document's chunks (freed once no other session holds them)
+            if self.chunks is not None:
+                self.chunk_store.release(self.document_hash)
+            self.documents = documents
+            self._document_text = None
+            self._drop_primary_from_portfolio()
+            self.document_id = doc_id or os.path.splitext(os.path.basename(pdf_path))[0]
             self.pdf_path = pdf_path
+            self.document_hash = self._hash_file(pdf_path)
+            self.vectorstore = None
+            self.qa_chain = None
+            self.chunks = None
+            self.document_tokens = None
+            self._window = None
+            self._analysis_results = {}
+            # Rebuild the chunk table now, so sources cited in restored history resolve
+            self.get_chunks()
             print(f"✅ NDA loaded successfully! ({len(self.documents)} pages)")
             return True
         except Exception as e:
             print(f"❌ Error loading NDA: {str(e)}")
             return False
 
-    def generate_document_summary(self) -> str:
-        """Generate a basic document summary"""
+    def _single_flight_key(self, operation: str, *params: Any) -> Optional[tuple]:
+        """Key identifying an expensive operation on this document, or None if it can't be shared"""
+        if self.document_hash is None:
+            return None
+        return (operation, self.document_hash) + params
+
+    def _run_stage(self, stage: str, fn, hedge: bool = True) -> Any:
+        """Run fn under the stage's deadline (raises StageTimeout when it passes)"""
+        return _deadlines.run(stage, fn, deadline=self.stage_deadlines.get(stage), hedge=hedge)
+
+    def _run_analysis(self, operation: str, fn, refresh: bool = False) -> str:
+        """Run a whole-document analysis once per document and model, and keep its result.
+
+        The result is stored even if the caller stopped waiting at a deadline, so
+        an analysis that finishes late is reused instead of paid for again.
+        """
+        key = self._single_flight_key(operation, self.model_name)
+        if not refresh and key in self._analysis_results:
+            return self._analysis_results[key]
+        result = _single_flight.do(key, fn)
+        self._analysis_results[key] = result
+        return result
+
+    def generate_document_summary(self, raise_errors: bool = False, refresh: bool = False) -> str:
+        """Generate a basic document summary (reused per document and model unless refresh).
+
+        Failures are returned as an "❌ Error ..." string, or raised with
+        raise_errors=True (background jobs and chat(), which must tell a failure
+        from a result).
+        """
         if not self.documents:
+            if raise_errors:
+                raise ValueError("No NDA document loaded")
             return "❌ No NDA document loaded"
 
         try:
-            print("📋 Generating document summary...")
-            summarize_chain = load_summarize_chain(
-                llm=self.llm,
-                chain_type="stuff",
-                prompt=ChatPromptTemplate.from_template(self.summary_prompt)
-            )
-            result = summarize_chain.invoke({"input_documents": self.documents})
-            summary = result.get("output_text", str(result))
-            print("✅ Summary generated!")
-            return summary
+            return self._run_analysis("summary", self._generate_document_summary, refresh=refresh)
         except Exception as e:
+            if raise_errors:
+                raise
             return f"❌ Error generating summary: {str(e)}"
 
-    def perform_legal_analysis(self) -> str:
-        """Perform detailed legal compliance analysis using your requirements"""
+    def _generate_document_summary(self) -> str:
+        print("📋 Generating document summary...")
+        summary = self._run_document_prompt(self.summary_template, SUMMARY_REQUEST)
+        print("✅ Summary generated!")
+        return summary
+
+    def perform_legal_analysis(self, raise_errors: bool = False, refresh: bool = False) -> str:
+        """Perform detailed legal compliance analysis using your requirements (reuse and errors as in generate_document_summary)"""
         if not self.documents:
+            if raise_errors:
+                raise ValueError("No NDA document loaded")
             return "❌ No NDA document loaded"
 
         try:
-            print("⚖️ Performing legal compliance analysis...")
-            analysis_chain = load_summarize_chain(
-                llm=self.llm,
-                chain_type="stuff",
-                prompt=ChatPromptTemplate.from_template(self.legal_analysis_prompt)
-            )
-            result = analysis_chain.invoke({"input_documents": self.documents})
-            analysis = result.get("output_text", str(result))
-            print("✅ Legal analysis completed!")
-            return analysis
+            return self._run_analysis("legal_analysis", self._perform_legal_analysis, refresh=refresh)
         except Exception as e:
+            if raise_errors:
+                raise
             return f"❌ Error performing legal analysis: {str(e)}"
 
-    def setup_rag_chain(self):
-        """Setup RAG chain for Q&A functionality using FAISS"""
+    def _perform_legal_analysis(self) -> str:
+        print("⚖️ Performing legal compliance analysis...")
+        analysis = self._run_document_prompt(self.legal_analysis_template, LEGAL_ANALYSIS_REQUEST)
+        print("✅ Legal analysis completed!")
+        return analysis
+
+    def _split_documents(self, documents: List[Any]) -> List[Any]:
+        """Split loaded pages into one chunk per clause, tagged with its section number"""
+        return split_into_clauses(documents)
+
+    def setup_rag_chain(self, degraded: Optional[List[str]] = None):
+        """Setup RAG chain for Q&A functionality using FAISS.
+
+        If the index build misses its deadline, the chain is still returned and
+        retrieval falls back to keyword search; "index_build" is added to degraded.
+        """
+        from langchain_core.prompts import PromptTemplate
+        from langchain_core.output_parsers import StrOutputParser
+
         if not self.documents:
             return None
 
-        try:
-            # Split documents into chunks
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=200,
-                separators=["\n\n", "\n", " ", ""],
-            )
-            chunks = text_splitter.split_documents(self.documents)
-
-            # Create FAISS vectorstore (instead of Chroma)
-            self.vectorstore = FAISS.from_documents(
-                chunks,
-                embedding=self.embeddings
-            )
+        # Small NDAs are answered from their full text, so they never need an index
+        if self.vectorstore is None and not self.uses_full_text():
+            try:
+                if self._index_building == self.document_hash:
+                    # Don't wait on a late build again; it stores the index when it finishes
+                    raise RuntimeError("index build still running")
+                self._run_stage("index_build", self._build_vectorstore_for_document, hedge=False)
+            except Exception as e:
+                print(f"⏱️ Index not ready ({str(e)}); falling back to keyword search")
+                if degraded is not None:
+                    degraded.append("index_build")
+
+        # The index only depends on the document, so build it once and reuse it
+        if self.qa_chain is not None:
+            return self.qa_chain
 
+        try:
             # Create QA prompt
             qa_prompt = PromptTemplate(
                 template=self.qa_prompt_template,
                 input_variables=["context", "question"]
             )
 
-            # Create retrieval QA chain
-            qa_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=self.vectorstore.as_retriever(search_kwargs={"k": 4}),
-                chain_type_kwargs={"prompt": qa_prompt},
-                return_source_documents=True
-            )
-            return qa_chain
+            # Retrieval happens in retrieve_context(), so the chain only generates
+            self.qa_chain = qa_prompt | self.llm | StrOutputParser()
+            return self.qa_chain
         except Exception as e:
             print(f"❌ Error setting up RAG chain: {str(e)}")
             return None
 
+    def get_chunks(self) -> List[Any]:
+        """Clause chunks of the loaded document, split once and interned in the chunk store"""
+        if self.chunks is None:
+            chunks = self._split_documents(self.documents)
+            # Keyed by the file hash, so chunk ids are stable across sessions and restarts
+            self.chunk_store.intern_chunks(chunks, doc_id=self.document_hash)
+            self.chunks = chunks
+        return self.chunks
+
+    def uses_full_text(self) -> bool:
+        """Whether the whole document fits the full-text token budget"""
+        if self.document_tokens is None:
+            count_tokens = get_token_counter()
+            self.document_tokens = sum(count_tokens(doc.page_content) for doc in self.documents)
+        return self.document_tokens <= self.full_text_token_budget
+
+    def retrieve_context(self, question: str, query_vector: Optional[List[float]] = None) -> List[Any]:
+        """Retrieve the chunks relevant to a question, with adaptive depth and score thresholding"""
+        from langchain_core.documents import Document
+
+        # Small documents go to the prompt whole; no embedding call at all
+        if self.uses_full_text():
+            return self.get_chunks()
+
+        n_chunks = len(self.get_chunks())
+        k = choose_k(question, n_chunks)
+        if self.vectorstore is None:
+            # Index build timed out or is still running
+            return keyword_search(question, self.get_chunks(), k)
+        if query_vector is None:
+            query_vector = self.embeddings.embed_query(question)
+
+        # MMR over a wider candidate pool avoids k near-duplicate excerpts of one clause
+        candidates = self.vectorstore.max_marginal_relevance_search_with_score_by_vector(
+            query_vector,
+            k=k,
+            fetch_k=min(n_chunks, k * 4),
+            lambda_mult=MMR_LAMBDA
+        )
+        # Both backends return squared L2 distances; for unit-length embeddings cos = 1 - d / 2
+        scored = [(doc, 1.0 - distance / 2.0) for doc, distance in candidates]
+
+        documents = [
+            Document(page_content=doc.page_content, metadata={**doc.metadata, "score": round(score, 4)})
+            for doc, score in filter_by_relevance(scored)
+        ]
+        if self.compress_context:
+            documents = compress_documents(question, documents, token_budget=self.compression_token_budget)
+        return documents
+
+    @staticmethod
+    def _format_context(documents: List[Any]) -> str:
+        """Label every excerpt with its clause so answers can cite it"""
+        return "\n\n".join(
+            f"[Section {doc.metadata.get('section', '')}]\n{doc.page_content}" for doc in documents
+        )
+
+    def _build_vectorstore_for_document(self):
+        """Build (or join the in-flight build of) this document's index and keep it.
+
+        The index is stored even if the caller stopped waiting at the deadline,
+        so a build that finishes late still serves the next question.
+        """
+        document_hash = self._index_building = self.document_hash
+        try:
+            # Concurrent sessions on the same NDA share a single index build
+            key = self._single_flight_key("rag_index", self.embeddings.model)
+            vectorstore = _single_flight.do(key, self._build_vectorstore)
+            if self.document_hash == document_hash:
+                self.vectorstore = vectorstore
+            return vectorstore
+        finally:
+            if self._index_building == document_hash:
+                self._index_building = None
+
+    def _build_vectorstore(self):
+        """Embed the document's chunks into an in-process NumPy index, or FAISS for large documents"""
+        chunks = self.get_chunks()
+        if len(chunks) <= self.numpy_index_max_chunks:
+            from vector_index import NumpyVectorIndex
+            return NumpyVectorIndex.from_documents(chunks, self.embeddings)
+
+        from langchain_community.vectorstores import FAISS
+
+        # Create FAISS vectorstore (instead of Chroma)
+        return FAISS.from_documents(
+            chunks,
+            embedding=self.embeddings
+        )
+
     def get_conversation_context(self, max_exchanges: int = 3) -> str:
         """Get recent conversation context for continuity"""
         history = self.get_conversation_history()
@@ -332,12 +663,34 @@ Answer:"""
 
         return "\n".join(context_parts)
 
+    def _retrieve_or_fallback(self, question: str, degraded: List[str]) -> List[Any]:
+        """retrieve_context under the retrieval deadline, else keyword search"""
+        try:
+            return self._run_stage("retrieval", lambda: self.retrieve_context(question))
+        except Exception as e:
+            print(f"⏱️ Retrieval degraded ({str(e)}); falling back to keyword search")
+            degraded.append("retrieval")
+            chunks = self.get_chunks()
+            return keyword_search(question, chunks, choose_k(question, len(chunks)))
+
+    def _verbatim_answer(self, documents: List[Any], error: Exception) -> str:
+        """Fallback answer when generation fails: the top retrieved clauses, quoted as they are"""
+        notice = f"⚠️ The answer could not be generated ({str(error)})."
+        if not documents:
+            return notice
+        return f"{notice} The most relevant clauses are quoted below.\n\n{self._format_context(documents[:3])}"
+
     def ask_question(self, question: str) -> Dict[str, Any]:
-        """Answer specific questions about the NDA using RAG with conversation context"""
+        """Answer specific questions about the NDA using RAG with conversation context.
+
+        Every stage runs under its deadline; "degraded" lists the stages that
+        fell back (keyword search for retrieval, quoted clauses for generation).
+        """
+        degraded: List[str] = []
         try:
-            qa_chain = self.setup_rag_chain()
+            qa_chain = self.setup_rag_chain(degraded)
             if qa_chain is None:
-                return {"answer": "❌ No NDA document loaded for Q&A or error setting up search"}
+                return {"answer": "❌ No NDA document loaded for Q&A or error setting up search", "degraded": degraded}
 
             # Add conversation context to the question
             conversation_context = self.get_conversation_context()
@@ -351,35 +704,344 @@ Please answer the current question while being aware of our previous discussion.
             else:
                 contextual_question = question
 
-            result = qa_chain({"query": contextual_question})
+            # Retrieve with the bare question; conversation context would only add noise to the search
+            source_documents = self._retrieve_or_fallback(question, degraded)
+            try:
+                answer = self._run_stage("generation", lambda: qa_chain.invoke({
+                    "context": self._format_context(source_documents),
+                    "question": contextual_question
+                }))
+            except Exception as e:
+                print(f"⏱️ Generation degraded ({str(e)}); quoting the retrieved clauses")
+                degraded.append("generation")
+                answer = self._verbatim_answer(source_documents, e)
             return {
-                "answer": result["result"],
-                "source_documents": result["source_documents"]
+                "answer": answer,
+                "source_documents": source_documents,
+                "degraded": degraded
             }
         except Exception as e:
-            return {"answer": f"❌ Error answering question: {str(e)}"}
+            return {"answer": f"❌ Error answering question: {str(e)}", "degraded": degraded}
+
+    def ask_questions(self, questions: List[str], max_concurrency: int = 4) -> List[Dict[str, Any]]:
+        """Answer a list of questions (e.g. a standard questionnaire) in one batch.
+
+        All questions are embedded in a single embeddings request, retrieved
+        against the shared index, and answered by concurrent LLM calls. Each
+        question is answered on its own, without conversation context.
+        """
+        questions = [q.strip() for q in questions if q and q.strip()]
+        if not questions:
+            return []
+
+        degraded: List[str] = []
+        qa_chain = self.setup_rag_chain(degraded)
+        if qa_chain is None:
+            return [{"question": q, "answer": "❌ No NDA document loaded for Q&A or error setting up search",
+                     "source_documents": [], "degraded": degraded} for q in questions]
+
+        print(f"❓ Answering {len(questions)} questions in one batch...")
+        if self.uses_full_text() or self.vectorstore is None:
+            contexts = [self.retrieve_context(q) for q in questions]
+        else:
+            try:
+                # One batched embedding request instead of one per question
+                query_vectors = self._run_stage("retrieval", lambda: self.embeddings.embed_documents(questions))
+                contexts = [self.retrieve_context(q, query_vector=v) for q, v in zip(questions, query_vectors)]
+            except Exception as e:
+                print(f"⏱️ Retrieval degraded ({str(e)}); falling back to keyword search")
+                degraded.append("retrieval")
+                chunks = self.get_chunks()
+                contexts = [keyword_search(q, chunks, choose_k(q, len(chunks))) for q in questions]
+
+        answers = qa_chain.batch(
+            [{"context": self._format_context(docs), "question": q} for q, docs in zip(questions, contexts)],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True
+        )
+
+        results = []
+        for question, docs, answer in zip(questions, contexts, answers):
+            question_degraded = list(degraded)
+            if isinstance(answer, Exception):
+                question_degraded.append("generation")
+                answer = self._verbatim_answer(docs, answer)
+            results.append({"question": question, "answer": answer, "source_documents": docs,
+                            "degraded": question_degraded})
+        print(f"✅ Answered {len(results)} questions")
+        return results
+
+    def _compliance_chain(self):
+        """Prompt -> JSON-mode LLM chain for checklist scoring, compiled once"""
+        if self._compliance_runnable is None:
+            from langchain_core.prompts import ChatPromptTemplate
+            from langchain_core.output_parsers import StrOutputParser
+
+            prompt = ChatPromptTemplate.from_template(self.compliance_prompt).partial(
+                checklist=checklist_instructions()
+            )
+            self._compliance_runnable = (
+                prompt | self.analysis_llm.bind(response_format={"type": "json_object"}) | StrOutputParser()
+            )
+        return self._compliance_runnable
+
+    @staticmethod
+    def _paged_text(pages: List[Any]) -> str:
+        """Document text with page markers, so the model can cite pages"""
+        return "\n\n".join(
+            f"[Page {page.metadata.get('page', i) + 1}]\n{page.page_content}" for i, page in enumerate(pages)
+        )
+
+    def score_compliance(self, doc_id: Optional[str] = None, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
+        """Score the loaded NDA against the Strada checklist as one compliance-matrix row (None on failure unless raise_errors)"""
+        if not self.documents:
+            if raise_errors:
+                raise ValueError("No NDA document loaded")
+            return None
 
-    def classify_intent(self, user_message: str) -> str:
-        """Classify user intent"""
+        key = self._single_flight_key("compliance", self.model_name)
         try:
-            intent = self.intent_chain.invoke({"user_message": user_message}).strip().upper()
-            return intent if intent in ["SUMMARY", "LEGAL_ANALYSIS", "QUESTION", "GENERAL"] else "QUESTION"
-        except:
-            return "QUESTION"
+            row = _single_flight.do(key, self._score_compliance)
+        except Exception as e:
+            print(f"❌ Error scoring compliance: {str(e)}")
+            if raise_errors:
+                raise
+            return None
+        # Concurrent callers share the row, so set the caller's own name on a copy
+        return {**row, "doc_id": doc_id or self.document_id or "current"}
+
+    def _score_compliance(self) -> Dict[str, Any]:
+        print("📊 Scoring NDA against the compliance checklist...")
+        response = self._compliance_chain().invoke({"text": self._paged_text(self.documents)})
+        row = to_row("", parse_compliance_response(response),
+                     document_hash=self.document_hash, model=self.model_name)
+        print(f"✅ Compliance scored ({row['high_priority_failures']} high-priority failures)")
+        return row
+
+    def score_portfolio_compliance(self, max_concurrency: int = 4) -> List[Dict[str, Any]]:
+        """Score every portfolio NDA concurrently; one compliance-matrix row per NDA.
+
+        A portfolio copy of the loaded NDA is skipped, since score_compliance() already covers it.
+        """
+        doc_ids = [doc_id for doc_id in self.list_portfolio_documents() if doc_id != self.document_id]
+        if not doc_ids:
+            return []
+
+        print(f"📊 Scoring {len(doc_ids)} portfolio NDAs against the compliance checklist...")
+        responses = self._compliance_chain().batch(
+            [{"text": self._paged_text(self.portfolio_documents[doc_id])} for doc_id in doc_ids],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True
+        )
+
+        rows = []
+        for doc_id, response in zip(doc_ids, responses):
+            if isinstance(response, Exception):
+                print(f"❌ Error scoring {doc_id}: {str(response)}")
+                continue
+            rows.append(to_row(doc_id, parse_compliance_response(response),
+                               document_hash=self.portfolio_hashes.get(doc_id), model=self.model_name))
+        return rows
+
+    def add_to_portfolio(self, pdf_path: str, doc_id: Optional[str] = None) -> Optional[str]:
+        """Add an NDA to the shared portfolio index without re-embedding the others"""
+        doc_id = doc_id or os.path.splitext(os.path.basename(pdf_path))[0]
+        if doc_id in self.portfolio_documents:
+            print(f"⚠️ '{doc_id}' is already in the portfolio")
+            return doc_id
 
-    def chat(self, user_message: str) -> Dict[str, Any]:
-        """Main chat interface with enhanced conversation memory"""
+        try:
+            from langchain_community.document_loaders import PyPDFLoader
+
+            print(f"📁 Adding NDA to portfolio: {doc_id}")
+            pages = PyPDFLoader(pdf_path).load()
+            for page in pages:
+                page.metadata["doc_id"] = doc_id
+
+            if doc_id == self.document_id:
+                # The portfolio copy replaces the loaded NDA's own vectors
+                self._drop_primary_from_portfolio()
+            file_hash = self._hash_file(pdf_path)
+            chunk_ids = self._index_portfolio_pages(doc_id, pages, file_hash)
+
+            self.portfolio_documents[doc_id] = pages
+            self.portfolio_chunk_ids[doc_id] = chunk_ids
+            self.portfolio_hashes[doc_id] = file_hash
+            print(f"✅ Added '{doc_id}' to portfolio ({len(pages)} pages, {len(chunk_ids)} chunks)")
+            return doc_id
+        except Exception as e:
+            print(f"❌ Error adding NDA to portfolio: {str(e)}")
+            return None
+
+    def _index_portfolio_pages(self, doc_id: str, pages: List[Any], file_hash: str) -> List[str]:
+        """Chunk and embed pages tagged with doc_id into the shared portfolio index; returns their vector ids"""
+        from langchain_community.vectorstores import FAISS
+
+        # Chunks inherit the page metadata, so every vector is tagged with its doc_id;
+        # the chunk store keys them by file hash, like the loaded NDA's chunks
+        chunks = self._split_documents(pages)
+        self.chunk_store.intern_chunks(chunks, doc_id=file_hash)
+        chunk_ids = [f"{doc_id}::{i}" for i in range(len(chunks))]
+
+        if self.portfolio_vectorstore is None:
+            self.portfolio_vectorstore = FAISS.from_documents(
+                chunks,
+                embedding=self.embeddings,
+                ids=chunk_ids
+            )
+        else:
+            # Append only the new NDA's vectors to the existing index
+            self.portfolio_vectorstore.add_documents(chunks, ids=chunk_ids)
+        return chunk_ids
+
+    def _include_primary_in_portfolio(self):
+        """Index the loaded NDA next to the portfolio NDAs, so cross-document queries cover it too"""
+        if (self._primary_portfolio_ids is not None or self.portfolio_vectorstore is None
+                or not self.documents or self.document_id in self.portfolio_documents):
+            return
+        from langchain_core.documents import Document
+
+        print(f"📁 Adding the loaded NDA to the portfolio index: {self.document_id}")
+        # Tagged copies, so the loaded document's own pages and chunks stay as they are
+        pages = [
+            Document(page_content=page.page_content, metadata={**page.metadata, "doc_id": self.document_id})
+            for page in self.documents
+        ]
+        self._primary_portfolio_ids = self._index_portfolio_pages(self.document_id, pages, self.document_hash)
+
+    def _drop_primary_from_portfolio(self):
+        """Remove the loaded NDA's vectors from the portfolio index (on reload or replacement)"""
+        if self._primary_portfolio_ids is None:
+            return
+        if self.portfolio_vectorstore is not None:
+            self.portfolio_vectorstore.delete(self._primary_portfolio_ids)
+        self.chunk_store.release(self.document_hash)
+        self._primary_portfolio_ids = None
+
+    def remove_from_portfolio(self, doc_id: str) -> bool:
+        """Remove an NDA and its vectors from the portfolio index"""
+        if doc_id not in self.portfolio_documents:
+            return False
+
+        self.portfolio_vectorstore.delete(self.portfolio_chunk_ids.pop(doc_id))
+        self.chunk_store.release(self.portfolio_hashes.pop(doc_id, None))
+        del self.portfolio_documents[doc_id]
+        if not self.portfolio_documents:
+            self._drop_primary_from_portfolio()
+            self.portfolio_vectorstore = None
+        print(f"🗑️ Removed '{doc_id}' from portfolio")
+        return True
+
+    def close(self):
+        """Release this analyzer's documents in the (possibly shared) chunk store"""
+        self._drop_primary_from_portfolio()
+        for doc_id in list(self.portfolio_documents):
+            self.remove_from_portfolio(doc_id)
+        if self.chunks is not None:
+            self.chunk_store.release(self.document_hash)
+            self.chunks = None
+
+    def list_portfolio_documents(self) -> List[str]:
+        """List the document ids added to the portfolio (the loaded NDA is searched with them but not listed)"""
+        return list(self.portfolio_documents.keys())
+
+    def search_portfolio(self, query: str, doc_id: Optional[str] = None, k: int = 4) -> List[Any]:
+        """Retrieve chunks across the portfolio and the loaded NDA, optionally restricted to a single NDA"""
+        if self.portfolio_vectorstore is None:
+            return []
+        self._include_primary_in_portfolio()
+
+        if doc_id is None:
+            return self.portfolio_vectorstore.similarity_search(query, k=k)
+
+        # The filter is applied after the vector search, so scan the whole (flat)
+        # index to guarantee the requested NDA's best chunks are never cut off
+        return self.portfolio_vectorstore.similarity_search(
+            query,
+            k=k,
+            filter={"doc_id": doc_id},
+            fetch_k=self.portfolio_vectorstore.index.ntotal
+        )
+
+    def ask_portfolio_question(self, question: str, doc_ids: Optional[List[str]] = None,
+                               k: int = 4) -> Dict[str, Any]:
+        """Answer a question across several NDAs in the portfolio"""
+        if not self.portfolio_documents:
+            return {"answer": "❌ No NDA documents in the portfolio", "source_documents": []}
+
+        from langchain_core.prompts import PromptTemplate
+        from langchain_core.output_parsers import StrOutputParser
+
+        try:
+            if doc_ids:
+                # Per-document retrieval, so every requested NDA is represented in the context
+                sources = []
+                for doc_id in doc_ids:
+                    sources.extend(self.search_portfolio(question, doc_id=doc_id, k=k))
+            else:
+                sources = self.search_portfolio(question, k=k * 2)
+
+            context = "\n\n".join(
+                f"[NDA: {doc.metadata.get('doc_id')}, section {doc.metadata.get('section')}, "
+                f"page {doc.metadata.get('page', 0) + 1}]\n{doc.page_content}"
+                for doc in sources
+            )
+            prompt = PromptTemplate(
+                template=self.portfolio_qa_prompt_template,
+                input_variables=["context", "question"]
+            )
+            answer = (prompt | self.llm | StrOutputParser()).invoke(
+                {"context": context, "question": question}
+            )
+            return {"answer": answer, "source_documents": sources}
+        except Exception as e:
+            return {"answer": f"❌ Error answering portfolio question: {str(e)}", "source_documents": []}
+
+    def classify_intent(self, user_message: str, degraded: Optional[List[str]] = None) -> str:
+        """Classify user intent, falling back to local keyword rules if the model is slow or fails"""
+        try:
+            intent = self._run_stage(
+                "intent", lambda: self.intent_chain.invoke({"user_message": user_message})
+            ).strip().upper()
+        except Exception as e:
+            print(f"⏱️ Intent classification degraded ({str(e)}); using local rules")
+            if degraded is not None:
+                degraded.append("intent")
+            return classify_intent_locally(user_message)
+        return intent if intent in ["SUMMARY", "LEGAL_ANALYSIS", "QUESTION", "GENERAL"] else "QUESTION"
+
+    def _generate_or_notice(self, what: str, generate, degraded: List[str], hedge: bool = True) -> str:
+        """Run a generation under its deadline; on timeout or failure, say so instead of blocking"""
+        try:
+            return self._run_stage("generation", generate, hedge=hedge)
+        except Exception as e:
+            print(f"⏱️ Generation degraded ({str(e)})")
+            degraded.append("generation")
+            return f"⚠️ The {what} could not be generated ({str(e)}). Please try again in a moment."
+
+    def chat(self, user_message: str, intent: Optional[str] = None) -> Dict[str, Any]:
+        """Main chat interface with enhanced conversation memory.
+
+        intent skips classification when the caller has already classified the
+        message. The response carries a "degraded" list naming the stages
+        (intent, retrieval, generation, index_build) that missed their deadline
+        or failed and fell back; it is empty for a normal answer.
+        """
         if not self.documents:
             return {
                 "response": "❌ Please load an NDA document first using load_nda_document(pdf_path)",
                 "intent": "ERROR",
-                "sources": []
+                "sources": [],
+                "source_refs": [],
+                "degraded": []
             }
 
         print(f"💬 User: {user_message}")
 
+        degraded: List[str] = []
+
         # Classify intent
-        intent = self.classify_intent(user_message)
+        intent = intent or self.classify_intent(user_message, degraded)
         print(f"🎯 Intent: {intent}")
 
         # Get conversation context for continuity
@@ -388,43 +1050,41 @@ Please answer the current question while being aware of our previous discussion.
         if intent == "SUMMARY":
             print("📄 Generating document summary...")
             if conversation_context:
-                # Check if user is asking for summary of specific aspects based on previous conversation
-                contextual_prompt = f"""Previous conversation context:
+                # Check if user is asking for summary of specific aspects based on previous conversation.
+                # The context goes after the document, so the cached instructions + document prefix still applies
+                contextual_request = f"""Previous conversation context:
 {conversation_context}
 
-The user is now asking for a summary. Based on our previous discussion, provide a document summary that's relevant to our conversation flow.
-
-{self.summary_prompt}"""
-                summarize_chain = load_summarize_chain(
-                    llm=self.llm,
-                    chain_type="stuff",
-                    prompt=ChatPromptTemplate.from_template(contextual_prompt)
+The user is now asking for a summary. Based on our previous discussion, provide a document summary that's relevant to our conversation flow."""
+                response = self._generate_or_notice(
+                    "summary",
+                    lambda: self._run_document_prompt(self.summary_template, contextual_request, llm=self.llm),
+                    degraded, hedge=False
                 )
-                result = summarize_chain.invoke({"input_documents": self.documents})
-                response = result.get("output_text", str(result))
             else:
-                response = self.generate_document_summary()
+                # raise_errors lets a failure reach _generate_or_notice and be flagged as degraded
+                response = self._generate_or_notice(
+                    "summary", lambda: self.generate_document_summary(raise_errors=True), degraded, hedge=False
+                )
             sources = []
 
         elif intent == "LEGAL_ANALYSIS":
             print("⚖️ Performing legal compliance analysis...")
             if conversation_context:
-                # Provide analysis with awareness of previous discussion
-                contextual_analysis_prompt = f"""Previous conversation context:
+                # Provide analysis with awareness of previous discussion, after the cached prefix
+                contextual_request = f"""Previous conversation context:
 {conversation_context}
 
-Based on our previous discussion, please provide a legal analysis that addresses our conversation flow.
-
-{self.legal_analysis_prompt}"""
-                analysis_chain = load_summarize_chain(
-                    llm=self.llm,
-                    chain_type="stuff",
-                    prompt=ChatPromptTemplate.from_template(contextual_analysis_prompt)
+Based on our previous discussion, please provide a legal analysis that addresses our conversation flow."""
+                response = self._generate_or_notice(
+                    "legal analysis",
+                    lambda: self._run_document_prompt(self.legal_analysis_template, contextual_request, llm=self.llm),
+                    degraded, hedge=False
                 )
-                result = analysis_chain.invoke({"input_documents": self.documents})
-                response = result.get("output_text", str(result))
             else:
-                response = self.perform_legal_analysis()
+                response = self._generate_or_notice(
+                    "legal analysis", lambda: self.perform_legal_analysis(raise_errors=True), degraded, hedge=False
+                )
             sources = []
 
         elif intent == "QUESTION":
@@ -432,6 +1092,7 @@ Based on our previous discussion, please provide a legal analysis that addresses
             qa_result = self.ask_question(user_message)
             response = qa_result["answer"]
             sources = qa_result.get("source_documents", [])
+            degraded.extend(qa_result.get("degraded", []))
 
         else:  # GENERAL
             print("💬 Handling general conversation...")
@@ -451,43 +1112,75 @@ User message: {user_message}
 
 Respond naturally and helpfully, taking into account our previous conversation:"""
 
-            response = self.llm.invoke(general_prompt).content
+            response = self._generate_or_notice("reply", lambda: self.llm.invoke(general_prompt).content, degraded)
             sources = []
 
         # Store in memory - ensure response is always a string
         response_str = self._ensure_string_response(response)
-        self.memory.chat_memory.add_user_message(user_message)
-        self.memory.chat_memory.add_ai_message(response_str)
+        source_refs = self.chunk_store.intern_sources(sources)
+        self.record_exchange(user_message, response_str, intent=intent, source_refs=source_refs)
 
         # Preview response
         preview = response_str[:200] + "..." if len(response_str) > 200 else response_str
         print(f"🤖 Assistant: {preview}")
         if sources:
             print(f"📚 Found {len(sources)} relevant document sections")
+        if degraded:
+            print(f"⚠️ Degraded stages: {', '.join(degraded)}")
 
         return {
             "response": response_str,
             "intent": intent,
-            "sources": sources
+            "sources": sources,
+            "source_refs": source_refs,
+            "degraded": degraded
         }
 
+    @property
+    def _conversation_key(self) -> tuple:
+        return self.session_id, self.document_hash or ""
+
+    def record_exchange(self, user_message: str, response: str, intent: Optional[str] = None,
+                        source_refs: Optional[list] = None, doc_hash: Optional[str] = None):
+        """Append a user/assistant exchange to the conversation store.
+
+        doc_hash files it under another document's conversation instead (e.g. a
+        background job that finished after a different NDA was loaded).
+        """
+        doc_hash = doc_hash or self.document_hash or ""
+        self.conversation_store.append(self.session_id, doc_hash, [
+            ("user", user_message, None, None),
+            ("assistant", response, intent, source_refs),
+        ])
+        if self._window is not None and doc_hash == (self.document_hash or ""):
+            self._window.append({"user": user_message, "assistant": response})
+
+    def get_messages(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The latest stored messages for this session and document, oldest first"""
+        return self.conversation_store.load(*self._conversation_key, limit=limit)
+
+    def count_messages(self) -> int:
+        return self.conversation_store.count(*self._conversation_key)
+
+    def get_intent_counts(self) -> Dict[str, int]:
+        """Number of assistant replies per intent in this conversation"""
+        return self.conversation_store.intent_counts(*self._conversation_key)
+
     def get_conversation_history(self) -> List[Dict[str, str]]:
-        """Get formatted conversation history"""
-        history = []
-        messages = self.memory.chat_memory.messages
-        for i in range(0, len(messages), 2):
-            if i + 1 < len(messages):
-                human_msg = messages[i]
-                ai_msg = messages[i + 1]
-                history.append({
-                    "user": human_msg.content,
-                    "assistant": ai_msg.content
-                })
-        return history
+        """Get formatted conversation history (the last memory_window exchanges)"""
+        if self._window is None:
+            # Lazily restore the window, e.g. when resuming a stored session
+            messages = self.get_messages(limit=2 * self.memory_window)
+            self._window = deque(maxlen=self.memory_window)
+            for user_msg, ai_msg in zip(messages, messages[1:]):
+                if user_msg["role"] == "user" and ai_msg["role"] == "assistant":
+                    self._window.append({"user": user_msg["content"], "assistant": ai_msg["content"]})
+        return list(self._window)
 
     def clear_memory(self):
         """Clear conversation memory"""
-        self.memory.clear()
+        self.conversation_store.clear(*self._conversation_key)
+        self._window = None
         print("🗑️ Chat history cleared")
 
     def show_conversation_summary(self):
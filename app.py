@@ -3,10 +3,16 @@ import os
 import tempfile
 from typing import Dict, Any, List
 import json
-from datetime import datetime
+import html
+import functools
+import uuid
 
 # Import your NDA analyzer class (assuming it's in the same directory or installed as a package)
 from NDA_chatbot import EnhancedNDAAnalyzer
+from job_queue import JobQueue, FAILED
+from conversation_store import ConversationStore
+from chunk_store import ChunkStore
+from compliance_matrix import build_compliance_frame, failure_summary
 
 # Page configuration
 st.set_page_config(
@@ -158,18 +164,47 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+CURRENT_NDA_SCOPE = "Current NDA"
+HISTORY_PAGE_SIZE = 10  # Messages rendered per page of chat history
+JOB_POLL_INTERVAL = 2  # Seconds between job status checks
+
+# Long analyses run as background jobs: kind -> (label, prompt shown in the chat, intent)
+ANALYSIS_JOBS = {
+    "summary": ("Document summary", "Please provide a summary of this NDA document", "SUMMARY"),
+    "legal_analysis": ("Legal analysis", "Please perform a detailed legal compliance analysis of this NDA", "LEGAL_ANALYSIS"),
+}
+# Chat messages with these intents are answered by the same background jobs
+ANALYSIS_INTENTS = {intent: kind for kind, (_, _, intent) in ANALYSIS_JOBS.items()}
+# The compliance matrix also runs as a job; its rows go to analysis_results, not the chat
+COMPLIANCE_JOB = "compliance"
+ALL_NDAS_SCOPE = "All NDAs (current + portfolio)"
+
 def initialize_session_state():
     """Initialize session state variables"""
     if 'analyzer' not in st.session_state:
         st.session_state.analyzer = None
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
+    if 'session_id' not in st.session_state:
+        # The conversation is stored under this id; keeping it in the URL lets a
+        # reconnect resume the same conversation once the same NDA is loaded again
+        if 'session' not in st.query_params:
+            st.query_params['session'] = uuid.uuid4().hex
+        st.session_state.session_id = st.query_params['session']
     if 'document_loaded' not in st.session_state:
         st.session_state.document_loaded = False
     if 'document_name' not in st.session_state:
         st.session_state.document_name = None
     if 'analysis_results' not in st.session_state:
         st.session_state.analysis_results = {}
+    if 'history_visible' not in st.session_state:
+        st.session_state.history_visible = HISTORY_PAGE_SIZE
+    if 'active_jobs' not in st.session_state:
+        # Job ids are mirrored in the URL, so a browser refresh can resume polling
+        st.session_state.active_jobs = [job_id for job_id in st.query_params.get('jobs', '').split(',') if job_id]
+    if 'chat_scope' not in st.session_state:
+        st.session_state.chat_scope = CURRENT_NDA_SCOPE
+    if 'job_prompts' not in st.session_state:
+        # Chat message that started a job, recorded with its result instead of the default prompt
+        st.session_state.job_prompts = {}
 
 def save_uploaded_file(uploaded_file):
     """Save uploaded file to temporary directory"""
@@ -181,60 +216,304 @@ def save_uploaded_file(uploaded_file):
         st.error(f"Error saving file: {str(e)}")
         return None
 
+@st.cache_resource
+def get_conversation_store() -> ConversationStore:
+    """One conversation store per Streamlit process; the single source of chat history"""
+    return ConversationStore()
+
+@st.cache_resource
+def get_chunk_store() -> ChunkStore:
+    """One chunk table per Streamlit process; sessions on the same NDA share its chunks"""
+    return ChunkStore()
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """One background job queue (and worker pool) per Streamlit process"""
+    return JobQueue()
+
+def sync_job_query_params():
+    """Mirror the active job ids in the URL"""
+    if st.session_state.active_jobs:
+        st.query_params['jobs'] = ','.join(st.session_state.active_jobs)
+    elif 'jobs' in st.query_params:
+        del st.query_params['jobs']
+
+def submit_analysis_job(kind: str, prompt: str = None):
+    """Button callback: run a summary or legal analysis on the background job queue"""
+    analyzer = st.session_state.analyzer
+    method = analyzer.generate_document_summary if kind == "summary" else analyzer.perform_legal_analysis
+    regenerate = st.session_state.get('regenerate_jobs', False)
+    # Raise on failure, so the job is marked failed instead of persisting the error as its result
+    task = functools.partial(method, raise_errors=True, refresh=regenerate)
+    job_id = get_job_queue().submit(
+        kind, analyzer.document_hash, task,
+        params=analyzer.model_name,
+        force=regenerate
+    )
+    if prompt:
+        st.session_state.job_prompts[job_id] = prompt
+    if job_id not in st.session_state.active_jobs:
+        st.session_state.active_jobs.append(job_id)
+    sync_job_query_params()
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def display_active_jobs():
+    """Poll background jobs and move finished results into the chat"""
+    queue = get_job_queue()
+    finished = []
+    for job_id in list(st.session_state.active_jobs):
+        job = queue.get(job_id)
+        if job is None:
+            st.session_state.active_jobs.remove(job_id)
+        elif job.is_finished:
+            finished.append(job)
+        else:
+            label = "Compliance matrix" if job.kind == COMPLIANCE_JOB else ANALYSIS_JOBS.get(job.kind, (job.kind,))[0]
+            st.info(f"⏳ {label} {job.status}... ({job.elapsed:.0f}s)")
+
+    if not finished or not st.session_state.analyzer:
+        return
+
+    analyzer = st.session_state.analyzer
+    for job in finished:
+        st.session_state.active_jobs.remove(job.job_id)
+        if job.kind == COMPLIANCE_JOB:
+            if job.doc_hash != analyzer.document_hash:
+                # Scored for an NDA that is no longer loaded
+                continue
+            st.session_state.analysis_results['compliance'] = job.result or []
+            st.session_state.analysis_results['compliance_error'] = job.error if job.status == FAILED else None
+            continue
+
+        label, prompt, intent = ANALYSIS_JOBS.get(job.kind, (job.kind, job.kind, job.kind.upper()))
+        prompt = st.session_state.job_prompts.pop(job.job_id, prompt)
+        if job.status == FAILED:
+            response, intent = f"I encountered an error: {job.error}", 'ERROR'
+        else:
+            response = job.result
+        # Filed under the job's own document, which may not be the one loaded now
+        analyzer.record_exchange(prompt, response, intent=intent, doc_hash=job.doc_hash)
+
+    sync_job_query_params()
+    st.rerun()
+
+def ask_analyzer(user_input: str, intent: str = None) -> Dict[str, Any]:
+    """Route a chat message to the current NDA or to the portfolio, depending on the chat scope"""
+    analyzer = st.session_state.analyzer
+    scope = st.session_state.chat_scope
+    if scope == CURRENT_NDA_SCOPE:
+        return analyzer.chat(user_input, intent=intent)
+
+    doc_ids = None if scope == ALL_NDAS_SCOPE else [scope]
+    result = analyzer.ask_portfolio_question(user_input, doc_ids=doc_ids)
+    sources = result.get('source_documents', [])
+    source_refs = analyzer.chunk_store.intern_sources(sources)
+    analyzer.record_exchange(user_input, result['answer'], intent='PORTFOLIO', source_refs=source_refs)
+    return {
+        'response': result['answer'],
+        'intent': 'PORTFOLIO',
+        'sources': sources,
+        'source_refs': source_refs,
+        'degraded': []
+    }
+
+def render_user_message_html(content: str) -> str:
+    """Build the HTML bubble for a user message (one st.markdown element)"""
+    return f"""
+    <div class="chat-message user-message">
+        <div class="message-content">
+            <div class="message-label">You</div>
+            {html.escape(content)}
+        </div>
+    </div>
+    """
+
+def render_message(message: Dict[str, Any]):
+    """Render a single chat message"""
+    if message['role'] == 'user':
+        # User message - left aligned, one cached HTML element
+        st.markdown(render_user_message_html(message['content']), unsafe_allow_html=True)
+        return
+
+    # Assistant message - one markdown element with its label, no columns or container
+    st.markdown(f":gray[**AI ASSISTANT**]\n\n{message['content']}")
+
+    # Show sources if available; messages only hold chunk ids, which are
+    # resolved against the analyzer's chunk store (rebuilt when an NDA is loaded)
+    source_refs = message.get('source_refs')
+    if source_refs and st.session_state.analyzer:
+        resolved = st.session_state.analyzer.chunk_store.resolve(source_refs)
+        if not resolved:
+            st.caption(f"📚 {len(source_refs)} sources cited; reload the NDA they came from to view them")
+        elif st.toggle(f"📚 Sources ({len(resolved)} documents)", key=f"sources_{message['id']}"):
+            lines = []
+            for j, (source, score) in enumerate(resolved):
+                section_label = f" [Section {source.section}]" if source.section else ""
+                score_label = f" (score {score:.2f})" if score is not None else ""
+                lines.append(f"Source {j+1}{section_label}{score_label}: {source.page_content[:200]}...")
+            st.text("\n\n".join(lines))
+
+def show_earlier_messages():
+    """Reveal one more page of older messages"""
+    st.session_state.history_visible += HISTORY_PAGE_SIZE
+
+@st.fragment
 def display_chat_history():
-    """Display the chat history with modern chat layout"""
-    if st.session_state.chat_history:
-        st.subheader("💬 Conversation History")
-        
-        for i, message in enumerate(st.session_state.chat_history):
-            if message['role'] == 'user':
-                # User message - left aligned
-                st.markdown(f"""
-                <div class="chat-message user-message">
-                    <div class="message-content">
-                        <div class="message-label">You</div>
-                        {message['content']}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-            else:
-                # Assistant message - right aligned with markdown support
-                st.markdown(f"""
-                <div class="chat-message assistant-message">
-                    <div class="message-content">
-                        <div class="message-label">AI Assistant</div>
-                """, unsafe_allow_html=True)
-                
-                # Create a custom container for markdown content
-                col1, col2 = st.columns([1, 3])  # This creates space on the left
-                with col2:
-                    # Display markdown content in a styled container
-                    st.markdown(f"""
-                    <div style="
-                        background-color: #ffffff;
-                        border: 1px solid #e2e8f0;
-                        border-radius: 15px;
-                        padding: 1rem;
-                        margin-bottom: 1rem;
-                        box-shadow: 0 2px 10px rgba(0,0,0,0.08);
-                    ">
-                    """, unsafe_allow_html=True)
-                    
-                    # Render the markdown content
-                    st.markdown(message['content'])
-                    
-                    st.markdown("</div>", unsafe_allow_html=True)
-                
-                st.markdown("</div></div>", unsafe_allow_html=True)
-                
-                # Show sources if available
-                if 'sources' in message and message['sources']:
-                    col1, col2 = st.columns([1, 3])
-                    with col2:
-                        with st.expander(f"📚 Sources ({len(message['sources'])} documents)", expanded=False):
-                            for j, source in enumerate(message['sources']):
-                                st.text(f"Source {j+1}: {source.page_content[:200]}...")
+    """Display the most recent messages; older ones are paginated on demand.
+
+    Runs as a fragment, so paging through history or opening sources only
+    reruns this block instead of the whole page. Only the visible page is read
+    from the conversation store.
+    """
+    analyzer = st.session_state.analyzer
+    total = analyzer.count_messages()
+    if not total:
+        return
+
+    st.subheader("💬 Conversation History")
+    messages = analyzer.get_messages(limit=st.session_state.history_visible)
+    hidden = total - len(messages)
+    if hidden > 0:
+        st.button(
+            f"⬆️ Show earlier messages ({hidden} hidden)",
+            on_click=show_earlier_messages,
+            key="show_earlier_messages"
+        )
+
+    for message in messages:
+        render_message(message)
+
+def render_latest_messages(count: int):
+    """Render the newest stored messages in place, without a full rerun"""
+    for message in st.session_state.analyzer.get_messages(limit=count):
+        render_message(message)
+
+def run_chat_turn(user_input: str):
+    """Send one message to the analyzer and render the new exchange incrementally"""
+    # Show the question right away; the stored copy is written with the answer
+    st.markdown(render_user_message_html(user_input), unsafe_allow_html=True)
+
+    # Whole-document analyses run as background jobs, like the Quick Actions,
+    # instead of blocking this run under the chat generation deadline
+    intent = None
+    if st.session_state.chat_scope == CURRENT_NDA_SCOPE:
+        with st.spinner("Analyzing your question..."):
+            intent = st.session_state.analyzer.classify_intent(user_input)
+        if intent in ANALYSIS_INTENTS:
+            submit_analysis_job(ANALYSIS_INTENTS[intent], prompt=user_input)
+            st.rerun()
+
+    # Get response from analyzer (which records the exchange)
+    result = {}
+    with st.spinner("Analyzing your question..."):
+        try:
+            result = ask_analyzer(user_input, intent=intent)
+        except Exception as e:
+            st.error(f"Error processing your request: {str(e)}")
+            st.session_state.analyzer.record_exchange(
+                user_input, f"I encountered an error: {str(e)}", intent='ERROR'
+            )
+
+    # Assistant response to history
+    render_latest_messages(1)
+    if result.get('degraded'):
+        st.caption(f"⚠️ Degraded response (slow or failing: {', '.join(result['degraded'])})")
+
+def run_questionnaire(questions: List[str]):
+    """Answer a list of questions in one batch and render each exchange incrementally"""
+    analyzer = st.session_state.analyzer
+    with st.spinner(f"Answering {len(questions)} questions..."):
+        results = analyzer.ask_questions(questions)
+
+    for result in results:
+        analyzer.record_exchange(
+            result['question'],
+            result['answer'],
+            intent='QUESTION',
+            source_refs=analyzer.chunk_store.intern_sources(result['source_documents'])
+        )
+    render_latest_messages(2 * len(results))
+
+def queue_questionnaire():
+    """Button callback: queue the pasted questions (one per line) for a batch answer"""
+    questions = [line.strip() for line in st.session_state.questionnaire_text.splitlines() if line.strip()]
+    if questions:
+        st.session_state.pending_questions = questions
+
+def queue_prompt(content: str):
+    """Button callback: queue a prompt to be answered in the current run"""
+    st.session_state.pending_prompt = content
+
+def score_compliance_matrix():
+    """Button callback: score the current NDA and every portfolio NDA against the checklist on the job queue"""
+    analyzer = st.session_state.analyzer
+
+    def task():
+        # The current NDA must score; portfolio NDAs that fail are left out of the matrix.
+        # Rows are named by document_id, like portfolio rows, so the NDA appears once
+        rows = [analyzer.score_compliance(doc_id=analyzer.document_id, raise_errors=True)]
+        rows += analyzer.score_portfolio_compliance()
+        return rows
+
+    # The result depends on the model and on exactly which NDAs are in the portfolio
+    params = json.dumps([analyzer.model_name, analyzer.document_id, sorted(analyzer.portfolio_hashes.items())])
+    job_id = get_job_queue().submit(
+        COMPLIANCE_JOB, analyzer.document_hash, task,
+        params=params,
+        force=st.session_state.get('regenerate_jobs', False)
+    )
+    if job_id not in st.session_state.active_jobs:
+        st.session_state.active_jobs.append(job_id)
+    sync_job_query_params()
+
+def display_compliance_matrix():
+    """One row per NDA, one column per checklist item; aggregates run locally on the frame"""
+    if st.session_state.analysis_results.get('compliance_error'):
+        st.error(f"❌ Compliance scoring failed: {st.session_state.analysis_results['compliance_error']}")
+    rows = st.session_state.analysis_results.get('compliance')
+    if not rows:
+        return
+
+    frame = build_compliance_frame(rows)
+    status_columns = ["doc_id", "high_priority_failures"] + [c for c in frame.columns if c.endswith("_status")]
+    st.dataframe(frame[status_columns], hide_index=True)
+    st.write("**Failures per checklist item:**")
+    st.dataframe(failure_summary(frame))
+    st.download_button(
+        "⬇️ Download matrix (CSV)",
+        frame.to_csv(index=False),
+        file_name="nda_compliance_matrix.csv",
+        mime="text/csv"
+    )
+
+def clear_chat():
+    """Button callback: reset the conversation"""
+    st.session_state.history_visible = HISTORY_PAGE_SIZE
+    if st.session_state.analyzer:
+        st.session_state.analyzer.clear_memory()
+
+def render_chat_statistics():
+    """Sidebar statistics for the current conversation"""
+    analyzer = st.session_state.analyzer
+    message_count = analyzer.count_messages() if analyzer else 0
+    if not message_count:
+        return
+
+    st.header("📊 Chat Statistics")
+    st.metric("Messages", message_count)
+
+    # Intent distribution
+    intent_counts = analyzer.get_intent_counts()
+    if intent_counts:
+        st.write("**Intent Distribution:**")
+        for intent, count in intent_counts.items():
+            st.write(f"• {intent}: {count}")
+
+    # Share of summary/analysis prompt tokens served from the provider's prompt cache
+    cache_stats = analyzer.get_prompt_cache_stats()
+    if cache_stats["prompt_tokens"]:
+        st.metric("Prompt cache hits", f"{cache_stats['hit_rate']:.0%}",
+                  help=f"{cache_stats['cached_tokens']:,} of {cache_stats['prompt_tokens']:,} prompt tokens cached")
 
 def main():
     # Initialize session state
@@ -310,19 +589,31 @@ def main():
             if st.button("🚀 Initialize Analyzer", type="primary"):
                 with st.spinner("Initializing analyzer..."):
                     try:
+                        # The previous analyzer's chunks are released from the shared store
+                        if st.session_state.analyzer:
+                            st.session_state.analyzer.close()
                         # Initialize analyzer
                         st.session_state.analyzer = EnhancedNDAAnalyzer(
                             openai_api_key=api_key,
-                            model_name=model_choice
+                            model_name=model_choice,
+                            conversation_store=get_conversation_store(),
+                            session_id=st.session_state.session_id,
+                            chunk_store=get_chunk_store()
                         )
                         
                         # Save and load document
                         temp_path = save_uploaded_file(uploaded_file)
                         if temp_path:
-                            success = st.session_state.analyzer.load_nda_document(temp_path)
+                            success = st.session_state.analyzer.load_nda_document(
+                                temp_path, doc_id=os.path.splitext(uploaded_file.name)[0]
+                            )
                             if success:
                                 st.session_state.document_loaded = True
                                 st.session_state.document_name = uploaded_file.name
+                                # Results and jobs of the previous NDA don't belong to this one
+                                st.session_state.analysis_results = {}
+                                st.session_state.active_jobs = []
+                                sync_job_query_params()
                                 st.success("✅ Analyzer initialized and document loaded!")
                                 # Clean up temp file
                                 os.unlink(temp_path)
@@ -349,6 +640,34 @@ def main():
             </div>
             """, unsafe_allow_html=True)
         
+        # Portfolio: additional NDAs sharing one search index
+        if st.session_state.document_loaded and st.session_state.analyzer:
+            st.subheader("📚 Portfolio")
+            portfolio_files = st.file_uploader(
+                "Add NDAs to portfolio",
+                type=['pdf'],
+                accept_multiple_files=True,
+                help="Compare terms across several NDAs, e.g. all NDAs for a deal"
+            )
+            if portfolio_files and st.button("➕ Add to Portfolio", use_container_width=True):
+                with st.spinner("Indexing portfolio documents..."):
+                    for portfolio_file in portfolio_files:
+                        temp_path = save_uploaded_file(portfolio_file)
+                        if temp_path:
+                            doc_id = os.path.splitext(portfolio_file.name)[0]
+                            st.session_state.analyzer.add_to_portfolio(temp_path, doc_id=doc_id)
+                            os.unlink(temp_path)
+
+            portfolio_ids = st.session_state.analyzer.list_portfolio_documents()
+            if portfolio_ids:
+                st.caption(f"{len(portfolio_ids)} NDA(s) indexed: {', '.join(portfolio_ids)}")
+                st.selectbox(
+                    "Chat scope",
+                    [CURRENT_NDA_SCOPE, ALL_NDAS_SCOPE] + portfolio_ids,
+                    key="chat_scope",
+                    help="Ask about the current NDA, across it and all portfolio NDAs, or a single portfolio NDA"
+                )
+
         st.divider()
         
         # Quick actions
@@ -358,34 +677,32 @@ def main():
             col1, col2 = st.columns(2)
             
             with col1:
-                if st.button("📄 Summary", use_container_width=True):
-                    st.session_state.quick_action = "summary"
+                st.button(
+                    "📄 Summary",
+                    use_container_width=True,
+                    on_click=submit_analysis_job,
+                    args=("summary",)
+                )
             
             with col2:
-                if st.button("⚖️ Legal Analysis", use_container_width=True):
-                    st.session_state.quick_action = "legal_analysis"
+                st.button(
+                    "⚖️ Legal Analysis",
+                    use_container_width=True,
+                    on_click=submit_analysis_job,
+                    args=("legal_analysis",)
+                )
             
-            if st.button("🗑️ Clear Chat", use_container_width=True):
-                st.session_state.chat_history = []
-                if st.session_state.analyzer:
-                    st.session_state.analyzer.clear_memory()
-                st.rerun()
+            st.checkbox(
+                "🔄 Regenerate",
+                key="regenerate_jobs",
+                help="Run the summary or analysis again instead of reusing a saved result"
+            )
+            st.button("🗑️ Clear Chat", use_container_width=True, on_click=clear_chat)
         
         st.divider()
         
-        # Conversation summary
-        if st.session_state.analyzer and st.session_state.chat_history:
-            st.header("📊 Chat Statistics")
-            st.metric("Messages", len(st.session_state.chat_history))
-            
-            # Intent distribution
-            intents = [msg.get('intent', 'Unknown') for msg in st.session_state.chat_history if msg['role'] == 'assistant']
-            if intents:
-                from collections import Counter
-                intent_counts = Counter(intents)
-                st.write("**Intent Distribution:**")
-                for intent, count in intent_counts.items():
-                    st.write(f"• {intent}: {count}")
+        # Conversation summary, filled in once this run's messages are appended
+        chat_statistics = st.container()
     
     # Main content area
     if not api_key:
@@ -403,89 +720,47 @@ def main():
         st.info("📁 Please upload an NDA document in the sidebar to begin analysis.")
         return
     
-    # Handle quick actions
-    if hasattr(st.session_state, 'quick_action'):
-        if st.session_state.quick_action == "summary":
-            with st.spinner("Generating document summary..."):
-                result = st.session_state.analyzer.chat("Please provide a summary of this NDA document")
-                st.session_state.chat_history.append({
-                    'role': 'user',
-                    'content': 'Please provide a summary of this NDA document',
-                    'timestamp': datetime.now()
-                })
-                st.session_state.chat_history.append({
-                    'role': 'assistant',
-                    'content': result['response'],
-                    'intent': result['intent'],
-                    'sources': result.get('sources', []),
-                    'timestamp': datetime.now()
-                })
-        elif st.session_state.quick_action == "legal_analysis":
-            with st.spinner("Performing legal analysis..."):
-                result = st.session_state.analyzer.chat("Please perform a detailed legal compliance analysis of this NDA")
-                st.session_state.chat_history.append({
-                    'role': 'user',
-                    'content': 'Please perform a detailed legal compliance analysis of this NDA',
-                    'timestamp': datetime.now()
-                })
-                st.session_state.chat_history.append({
-                    'role': 'assistant',
-                    'content': result['response'],
-                    'intent': result['intent'],
-                    'sources': result.get('sources', []),
-                    'timestamp': datetime.now()
-                })
-        
-        # Clear the quick action
-        delattr(st.session_state, 'quick_action')
-        st.rerun()
-    
     # Chat interface
     st.header("💬 Chat with NDA Analyzer")
     
     # Display chat history
     display_chat_history()
+    # Exchanges answered in this run go directly below the history, above the expanders
+    new_messages = st.container()
+    
+    # Background analyses in progress
+    if st.session_state.active_jobs:
+        display_active_jobs()
+    
+    # Questionnaire: several questions answered in one batch
+    with st.expander("📝 Ask several questions at once"):
+        st.text_area(
+            "Questions (one per line)",
+            key="questionnaire_text",
+            height=150,
+            placeholder="Who are the parties?\nWhat is the governing law?\nHow long is the non-solicitation period?"
+        )
+        st.button("Answer all", on_click=queue_questionnaire)
+    
+    # Compliance matrix: current NDA plus the portfolio, scored item by item
+    with st.expander("📊 Compliance matrix"):
+        st.button("Score checklist", on_click=score_compliance_matrix)
+        display_compliance_matrix()
     
     # Chat input (must be outside any container)
     user_input = st.chat_input("Ask me anything about the NDA document...")
     
-    if user_input:
-        # Add user message to history
-        st.session_state.chat_history.append({
-            'role': 'user',
-            'content': user_input,
-            'timestamp': datetime.now()
-        })
-        
-        # Get response from analyzer
-        with st.spinner("Analyzing your question..."):
-            try:
-                result = st.session_state.analyzer.chat(user_input)
-                
-                # Add assistant response to history
-                st.session_state.chat_history.append({
-                    'role': 'assistant',
-                    'content': result['response'],
-                    'intent': result['intent'],
-                    'sources': result.get('sources', []),
-                    'timestamp': datetime.now()
-                })
-                
-            except Exception as e:
-                st.error(f"Error processing your request: {str(e)}")
-                st.session_state.chat_history.append({
-                    'role': 'assistant',
-                    'content': f"I encountered an error: {str(e)}",
-                    'intent': 'ERROR',
-                    'sources': [],
-                    'timestamp': datetime.now()
-                })
-        
-        # Rerun to display new messages
-        st.rerun()
+    # New exchanges are rendered below the history in this run; no st.rerun() needed
+    with new_messages:
+        if user_input:
+            run_chat_turn(user_input)
+        elif 'pending_prompt' in st.session_state:
+            run_chat_turn(st.session_state.pop('pending_prompt'))
+        elif 'pending_questions' in st.session_state:
+            run_questionnaire(st.session_state.pop('pending_questions'))
     
     # Example questions
-    if not st.session_state.chat_history:
+    if not st.session_state.analyzer.count_messages():
         st.subheader("💡 Example Questions")
         
         example_questions = [
@@ -501,42 +776,10 @@ def main():
         cols = st.columns(2)
         for i, question in enumerate(example_questions):
             with cols[i % 2]:
-                if st.button(question, key=f"example_{i}"):
-                    # Simulate clicking the question
-                    st.session_state.example_question = question
-                    st.rerun()
-    
-    # Handle example question clicks
-    if hasattr(st.session_state, 'example_question'):
-        user_input = st.session_state.example_question
-        
-        # Add user message to history
-        st.session_state.chat_history.append({
-            'role': 'user',
-            'content': user_input,
-            'timestamp': datetime.now()
-        })
-        
-        # Get response from analyzer
-        with st.spinner("Analyzing your question..."):
-            try:
-                result = st.session_state.analyzer.chat(user_input)
-                
-                # Add assistant response to history
-                st.session_state.chat_history.append({
-                    'role': 'assistant',
-                    'content': result['response'],
-                    'intent': result['intent'],
-                    'sources': result.get('sources', []),
-                    'timestamp': datetime.now()
-                })
-                
-            except Exception as e:
-                st.error(f"Error processing your request: {str(e)}")
-        
-        # Clear the example question
-        delattr(st.session_state, 'example_question')
-        st.rerun()
+                st.button(question, key=f"example_{i}", on_click=queue_prompt, args=(question,))
+    
+    with chat_statistics:
+        render_chat_statistics()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,77 @@
+"""Import-time profile for the NDA analyzer.
+
+Runs ``python -X importtime`` in a fresh interpreter for each target and
+reports the total cumulative import time plus the slowest modules, e.g.:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --target app_stack --top 25
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What each target imports in a cold interpreter
+TARGETS = {
+    # What app.py pays on every script start before an analyzer exists
+    "module": "import NDA_chatbot",
+    # The same, plus the helper modules the app imports
+    "app_stack": "import NDA_chatbot, chunk_store, job_queue",
+    # The full LangChain/FAISS stack, loaded on first analyzer use
+    "full_stack": (
+        "import NDA_chatbot; "
+        "import langchain_openai, langchain_core.prompts, langchain_core.output_parsers, "
+        "langchain_core.documents, langchain_community.vectorstores, langchain_community.document_loaders"
+    ),
+}
+
+
+def profile_imports(statement: str) -> List[Tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for every module imported by the statement"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        rows.append((module.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def report(name: str, rows: List[Tuple[str, int, int]], top: int):
+    # Top-level imports are the ones without indentation; their cumulative times add up to the total
+    total_us = sum(cumulative for module, _, cumulative in rows if not module.startswith("  "))
+    print(f"\n=== {name}: {total_us / 1000:.1f} ms total, {len(rows)} modules ===")
+    for module, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:9.1f} ms cumulative {self_us / 1000:8.1f} ms self  {module.strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=sorted(TARGETS), action="append",
+                        help="Target(s) to profile (default: all)")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list")
+    args = parser.parse_args()
+
+    for name in args.target or list(TARGETS):
+        try:
+            rows = profile_imports(TARGETS[name])
+        except RuntimeError as e:
+            print(f"\n=== {name}: skipped ({e}) ===")
+            continue
+        report(name, rows, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""Load test: how many concurrent reviewers can one app process serve?
+
+Starts the local mock OpenAI server (mock_openai.py), writes a few synthetic
+NDA PDFs, then for each concurrency level runs N simulated sessions at once.
+Every session loads an NDA and asks a mix of questions, summaries, legal
+analyses and small talk through ``EnhancedNDAAnalyzer.chat()`` (or, with
+``--mode app``, through app.py via Streamlit's AppTest). Reports throughput,
+latency percentiles, degraded/failed turns and memory per session, and where
+throughput stops scaling or p95 latency breaks the SLO.
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --users 1 4 16 64 --turns 5 --latency-ms 800
+    python benchmarks/load_test.py --mode app --users 1 2 4 8 --json results.json
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_openai import MockOpenAI, MockOpenAIServer  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+
+DEFAULT_USERS = [1, 2, 4, 8, 16, 32]
+
+# What simulated reviewers ask, and how often (intent -> weight)
+QUESTIONS = {
+    "QUESTION": [
+        "Who are the parties to this agreement?",
+        "What is the governing law?",
+        "How long does the non-solicitation last?",
+        "Is there a penalty for breach?",
+        "What happens to confidential information when the agreement ends?",
+        "Who may the receiving party share information with?",
+    ],
+    "SUMMARY": ["Summarize this NDA", "Give me an overview of the agreement"],
+    "LEGAL_ANALYSIS": ["Check this NDA against our requirements", "Give me a legal analysis"],
+    "GENERAL": ["Hello", "Thanks!"],
+}
+DEFAULT_MIX = {"QUESTION": 0.7, "SUMMARY": 0.1, "LEGAL_ANALYSIS": 0.1, "GENERAL": 0.1}
+
+# Throughput gains below this between two levels count as saturation
+SCALING_THRESHOLD = 1.10
+
+
+# ---------------------------------------------------------------- synthetic NDAs
+
+def _clauses(seed: int, sentences: int) -> List[Tuple[str, str]]:
+    """Numbered NDA clauses with a few terms varied per seed"""
+    rng = random.Random(seed)
+    party = rng.choice(["Acme Holdings NV", "Borealis Medical SA", "Castor Logistics BV", "Delta Foods SRL"])
+    law = rng.choice(["Belgian", "Dutch", "English", "New York"])
+    term = rng.choice([2, 3, 5])
+    months = rng.choice([6, 12, 24])
+    filler = ("The Receiving Party shall protect the Confidential Information with at least the same degree "
+              "of care it uses for its own confidential information of a similar nature.")
+    clauses = [
+        ("Parties", f"This agreement is entered into between {party} (the Disclosing Party) and "
+                    "Strada Partners (the Receiving Party) in connection with a potential investment."),
+        ("Definitions", "Confidential Information means all information disclosed by the Disclosing Party, "
+                        "whether written or oral, including business plans, financial data and know-how."),
+        ("Confidentiality Obligations", "The Receiving Party shall keep the Confidential Information strictly "
+                                        "confidential and use it solely to evaluate the transaction."),
+        ("Permitted Disclosure", "The Receiving Party may disclose Confidential Information to its directors, "
+                                 "employees, advisers and potential co-investors who need to know it."),
+        ("Return of Information", "Upon request the Receiving Party shall return or destroy the Confidential "
+                                  "Information, except copies kept in automatic electronic back-ups."),
+        ("Non-Solicitation", f"For {months} months the Receiving Party shall not solicit employees of the "
+                             "Disclosing Party, excluding general advertisements."),
+        ("No Obligation to Invest", "Nothing in this agreement obliges either party to enter into any "
+                                    "transaction or to make any investment."),
+        ("Term", f"This agreement remains in force for {term} years from the date of signature."),
+        ("Governing Law", f"This agreement is governed by {law} law and the courts of its capital have "
+                          "exclusive jurisdiction."),
+    ]
+    return [(title, " ".join([body] + [filler] * sentences)) for title, body in clauses]
+
+
+def _wrap(text: str, width: int = 95) -> List[str]:
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    return lines + ([line] if line else [])
+
+
+def write_pdf(path: str, lines: List[str], lines_per_page: int = 55):
+    """Minimal text-only PDF (Helvetica), enough for PyPDFLoader to extract the text"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_numbers = []
+    for page in pages:
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in page]
+        stream = ("BT /F1 10 Tf 13 TL 50 760 Td " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET")
+        stream_bytes = stream.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream_bytes) + stream_bytes + b"\nendstream")
+        content_number = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_number)
+        page_numbers.append(len(objects))
+    kids = " ".join(f"{number} 0 R" for number in page_numbers).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_numbers)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_synthetic_ndas(directory: str, count: int, sentences: int) -> List[str]:
+    paths = []
+    for seed in range(count):
+        lines = []
+        for number, (title, body) in enumerate(_clauses(seed, sentences), 1):
+            lines += [f"{number}. {title}"] + _wrap(body) + [""]
+        path = os.path.join(directory, f"synthetic_nda_{seed + 1}.pdf")
+        write_pdf(path, lines)
+        paths.append(path)
+    return paths
+
+
+# ---------------------------------------------------------------- sessions
+
+def _rss_mb() -> float:
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def _pick_question(rng: random.Random, mix: Dict[str, float]) -> Tuple[str, str]:
+    intent = rng.choices(list(mix), weights=list(mix.values()))[0]
+    return intent, rng.choice(QUESTIONS[intent])
+
+
+def _make_analyzer(args, store, session_id: str):
+    from NDA_chatbot import EnhancedNDAAnalyzer
+
+    analyzer = EnhancedNDAAnalyzer(
+        openai_api_key="sk-load-test",
+        model_name=args.model,
+        conversation_store=store,
+        session_id=session_id
+    )
+    # The mock accepts plain strings; skip client-side tiktoken chunking, which
+    # would need to download its encoding files
+    analyzer.embeddings.check_embedding_ctx_length = False
+    return analyzer
+
+
+def run_analyzer_session(session_id: str, pdf_path: str, args, store, rng: random.Random) -> Dict[str, Any]:
+    """One simulated reviewer calling EnhancedNDAAnalyzer.chat() directly"""
+    analyzer = _make_analyzer(args, store, session_id)
+    start = time.perf_counter()
+    loaded = analyzer.load_nda_document(pdf_path)
+    turns = [{"intent": "LOAD", "latency": time.perf_counter() - start, "failed": not loaded, "degraded": False}]
+
+    for _ in range(args.turns if loaded else 0):
+        intent, question = _pick_question(rng, args.mix)
+        start = time.perf_counter()
+        try:
+            result = analyzer.chat(question)
+            failed = result["response"].startswith("❌")
+            degraded = bool(result.get("degraded"))
+        except Exception:
+            failed, degraded = True, False
+        turns.append({"intent": intent, "latency": time.perf_counter() - start,
+                      "failed": failed, "degraded": degraded})
+        time.sleep(args.think_time)
+    return {"turns": turns, "keep_alive": analyzer}
+
+
+def run_app_session(session_id: str, pdf_path: str, args, store, rng: random.Random) -> Dict[str, Any]:
+    """One simulated reviewer driving app.py through Streamlit's AppTest.
+
+    AppTest cannot upload files, so the analyzer is created and loaded here and
+    placed in session state, as the "Initialize Analyzer" button would do.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    analyzer = _make_analyzer(args, store, session_id)
+    start = time.perf_counter()
+    loaded = analyzer.load_nda_document(pdf_path)
+    turns = [{"intent": "LOAD", "latency": time.perf_counter() - start, "failed": not loaded, "degraded": False}]
+    if not loaded:
+        return {"turns": turns, "keep_alive": analyzer}
+
+    at = AppTest.from_file(APP_PATH, default_timeout=args.app_timeout)
+    at.session_state["analyzer"] = analyzer
+    at.session_state["session_id"] = session_id
+    at.session_state["document_loaded"] = True
+    at.session_state["document_name"] = os.path.basename(pdf_path)
+    at.run()
+    at.sidebar.text_input[0].set_value("sk-load-test").run()
+
+    for _ in range(args.turns):
+        intent, question = _pick_question(rng, args.mix)
+        start = time.perf_counter()
+        try:
+            at.chat_input[0].set_value(question).run()
+            failed = bool(at.exception) or bool(at.error)
+            degraded = any(caption.value.startswith("⚠️ Degraded") for caption in at.caption)
+        except Exception:
+            failed, degraded = True, False
+        turns.append({"intent": intent, "latency": time.perf_counter() - start,
+                      "failed": failed, "degraded": degraded})
+        time.sleep(args.think_time)
+    return {"turns": turns, "keep_alive": (analyzer, at)}
+
+
+# ---------------------------------------------------------------- reporting
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_level(users: int, pdf_paths: List[str], args, store) -> Dict[str, Any]:
+    """Run `users` sessions at once and summarise their chat turns"""
+    session = run_app_session if args.mode == "app" else run_analyzer_session
+    gc.collect()
+    rss_before = _rss_mb()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        futures = [
+            pool.submit(session, f"load-{users}-{i}", pdf_paths[i % len(pdf_paths)], args, store,
+                        random.Random(args.seed * 1000 + i))
+            for i in range(users)
+        ]
+        sessions = [future.result() for future in futures]
+    wall = time.perf_counter() - start
+    # Sessions are still referenced here, so the RSS delta is what they hold
+    rss_per_session = max(_rss_mb() - rss_before, 0.0) / users
+
+    turns = [turn for s in sessions for turn in s["turns"] if turn["intent"] != "LOAD"]
+    loads = [turn for s in sessions for turn in s["turns"] if turn["intent"] == "LOAD"]
+    latencies = [turn["latency"] for turn in turns]
+    by_intent = {}
+    for intent in QUESTIONS:
+        intent_latencies = [turn["latency"] for turn in turns if turn["intent"] == intent]
+        if intent_latencies:
+            by_intent[intent] = {"turns": len(intent_latencies), "p50": percentile(intent_latencies, 50),
+                                 "p95": percentile(intent_latencies, 95)}
+    del sessions
+    return {
+        "users": users,
+        "turns": len(turns),
+        "wall_s": wall,
+        "throughput": len(turns) / wall if wall else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "load_p95": percentile([turn["latency"] for turn in loads], 95),
+        "failed": sum(turn["failed"] for turn in turns + loads),
+        "degraded": sum(turn["degraded"] for turn in turns),
+        "mb_per_session": rss_per_session,
+        "by_intent": by_intent,
+    }
+
+
+def find_saturation(levels: List[Dict[str, Any]], slo_p95: float) -> Dict[str, Optional[int]]:
+    """Where adding users stops adding throughput, and where p95 first breaks the SLO"""
+    knee = None
+    for previous, current in zip(levels, levels[1:]):
+        if current["throughput"] < previous["throughput"] * SCALING_THRESHOLD:
+            knee = previous["users"]
+            break
+    slo_break = next((level["users"] for level in levels if level["p95"] > slo_p95), None)
+    peak = max(levels, key=lambda level: level["throughput"])["users"] if levels else None
+    return {"peak_throughput_users": peak, "scaling_stops_after": knee, "slo_broken_at": slo_break}
+
+
+def print_level(level: Dict[str, Any]):
+    print(f"{level['users']:>6} {level['turns']:>6} {level['throughput']:>9.2f} {level['p50']:>8.2f} "
+          f"{level['p95']:>8.2f} {level['p99']:>8.2f} {level['load_p95']:>8.2f} {level['degraded']:>6} "
+          f"{level['failed']:>6} {level['mb_per_session']:>8.1f}")
+
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    """'QUESTION=0.7,SUMMARY=0.1,...' -> weights"""
+    mix = {}
+    for part in text.split(","):
+        intent, weight = part.split("=")
+        intent = intent.strip().upper()
+        if intent not in QUESTIONS:
+            raise argparse.ArgumentTypeError(f"unknown intent {intent}; use {', '.join(QUESTIONS)}")
+        mix[intent] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["analyzer", "app"], default="analyzer",
+                        help="Drive EnhancedNDAAnalyzer.chat() directly, or app.py through Streamlit's AppTest")
+    parser.add_argument("--users", type=int, nargs="+", default=DEFAULT_USERS, help="Concurrency levels to test")
+    parser.add_argument("--turns", type=int, default=4, help="Chat turns per session")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds between a session's turns")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX,
+                        help="Intent weights, e.g. QUESTION=0.7,SUMMARY=0.1,LEGAL_ANALYSIS=0.1,GENERAL=0.1")
+    parser.add_argument("--nda", action="append", default=[], help="NDA PDF to use (repeatable)")
+    parser.add_argument("--synthetic-ndas", type=int, default=3, help="Synthetic NDAs to generate without --nda")
+    parser.add_argument("--clause-sentences", type=int, default=10,
+                        help="Boilerplate sentences per synthetic clause (controls document size)")
+    parser.add_argument("--model", default="gpt-4o")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Mock median chat latency")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Mock log-normal latency sigma")
+    parser.add_argument("--embedding-latency-ms", type=float, default=80.0)
+    parser.add_argument("--max-in-flight", type=int, default=0, help="Mock rate limit (429 above this; 0 = off)")
+    parser.add_argument("--slo", type=float, default=10.0, help="p95 chat latency target in seconds")
+    parser.add_argument("--app-timeout", type=float, default=120.0, help="AppTest script run timeout")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Keep the analyzer's progress output")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    mock = MockOpenAI(args.latency_ms, args.jitter, embedding_latency_ms=args.embedding_latency_ms,
+                      max_in_flight=args.max_in_flight, seed=args.seed)
+    with MockOpenAIServer(mock) as server, tempfile.TemporaryDirectory() as workdir:
+        # Picked up by the OpenAI client inside every analyzer
+        os.environ["OPENAI_BASE_URL"] = os.environ["OPENAI_API_BASE"] = server.base_url
+        os.environ.setdefault("NDA_CONVERSATION_DB", os.path.join(workdir, "conversations.sqlite3"))
+        from conversation_store import ConversationStore
+
+        pdf_paths = args.nda or write_synthetic_ndas(workdir, args.synthetic_ndas, args.clause_sentences)
+        # One store per process, like the app's cached conversation store
+        store = ConversationStore(os.environ["NDA_CONVERSATION_DB"])
+
+        print(f"🧪 Mock OpenAI at {server.base_url}; {len(pdf_paths)} NDA(s); mode={args.mode}; "
+              f"{args.turns} turns/session; median latency {args.latency_ms:.0f} ms")
+        print(f"{'users':>6} {'turns':>6} {'turns/s':>9} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} "
+              f"{'load95':>8} {'degr':>6} {'fail':>6} {'MB/sess':>8}")
+
+        levels = []
+        with open(os.devnull, "w") as devnull:
+            for users in args.users:
+                # The analyzer prints progress for every step; keep the table readable
+                with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull):
+                    level = run_level(users, pdf_paths, args, store)
+                levels.append(level)
+                print_level(level)
+
+        saturation = find_saturation(levels, args.slo)
+        print(f"\nPeak throughput at {saturation['peak_throughput_users']} concurrent users")
+        if saturation["scaling_stops_after"] is not None:
+            print(f"Throughput stops scaling after {saturation['scaling_stops_after']} users "
+                  f"(<{(SCALING_THRESHOLD - 1):.0%} gain at the next level)")
+        if saturation["slo_broken_at"] is not None:
+            print(f"p95 latency exceeds the {args.slo:g}s SLO at {saturation['slo_broken_at']} users")
+        print(f"Mock served {mock.requests} requests ({mock.rejected} rate-limited)")
+
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"config": {k: v for k, v in vars(args).items() if k != "json"},
+                           "levels": levels, "saturation": saturation}, f, indent=2)
+            print(f"💾 Results written to {args.json}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
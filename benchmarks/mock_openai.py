@@ -0,0 +1,265 @@
+"""Local mock of the OpenAI chat completions and embeddings endpoints.
+
+Answers instantly-shaped but artificially delayed responses, so the analyzer
+can be load-tested without API keys or costs. Latency is log-normal around a
+configurable median, plus a per-1k-prompt-token cost; an optional in-flight
+limit answers 429 like a rate-limited account. Used by load_test.py, or on its
+own to point a real app.py at it:
+
+    python benchmarks/mock_openai.py --port 8765 --latency-ms 400
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 streamlit run app.py
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from degradation import classify_intent_locally  # noqa: E402
+
+DIMENSIONS = 1536
+# OpenAI caches prompt prefixes of at least 1024 tokens, in 128-token increments
+CACHE_MIN_TOKENS = 1024
+CACHE_INCREMENT = 128
+
+WORD = re.compile(r"\w+")
+
+CANNED_ANSWER = (
+    "According to Section 4, the receiving party must keep the Confidential Information strictly "
+    "confidential for the term of the agreement. [mock answer]"
+)
+CANNED_REPORT = (
+    "## Executive Summary\n- Overall assessment: Needs Revision\n- 2 critical issues found\n\n"
+    "## Critical Issues (HIGH PRIORITY)\n- Section 7: non-solicitation of 24 months exceeds 12 months. [mock report]"
+)
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def embed(item: Any) -> np.ndarray:
+    """Hashed bag-of-words vector: texts sharing words get a positive cosine similarity"""
+    terms = [str(token) for token in item] if isinstance(item, list) else WORD.findall(str(item).lower())
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for term in terms or [""]:
+        h = zlib.crc32(term.encode())
+        vector[h % DIMENSIONS] += 1.0 if h & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class MockOpenAI:
+    """Latency model, rate limit and prompt-prefix cache shared by all request threads"""
+
+    def __init__(self, latency_ms: float = 300.0, jitter: float = 0.5, per_1k_prompt_tokens_ms: float = 40.0,
+                 embedding_latency_ms: float = 80.0, max_in_flight: int = 0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.per_1k_prompt_tokens_ms = per_1k_prompt_tokens_ms
+        self.embedding_latency_ms = embedding_latency_ms
+        self.max_in_flight = max_in_flight
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._prefixes = set()
+        self.requests = 0
+        self.rejected = 0
+
+    def delay(self, median_ms: float, prompt_tokens: int = 0):
+        """Sleep for one simulated provider round trip"""
+        with self._lock:
+            factor = self._random.lognormvariate(0.0, self.jitter) if self.jitter else 1.0
+        time.sleep((median_ms * factor + prompt_tokens / 1000 * self.per_1k_prompt_tokens_ms) / 1000)
+
+    def admit(self) -> bool:
+        """Count a request in flight, or refuse it when the simulated rate limit is reached"""
+        with self._lock:
+            self.requests += 1
+            if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                self.rejected += 1
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def cached_tokens(self, messages: List[Dict[str, Any]]) -> int:
+        """Tokens of the longest previously seen message prefix, as OpenAI's prompt cache would report"""
+        cached, prefix_tokens = 0, 0
+        digest = hashlib.sha256()
+        with self._lock:
+            for message in messages[:-1]:
+                text = _message_text(message)
+                digest.update(f"{message.get('role')}\0{text}\0".encode())
+                prefix_tokens += _count_tokens(text)
+                key = digest.hexdigest()
+                if key in self._prefixes:
+                    cached = prefix_tokens
+                else:
+                    self._prefixes.add(key)
+        if cached < CACHE_MIN_TOKENS:
+            return 0
+        return cached - cached % CACHE_INCREMENT
+
+    def chat_completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        messages = body.get("messages", [])
+        system = " ".join(_message_text(m) for m in messages if m.get("role") == "system")
+        last = _message_text(messages[-1]) if messages else ""
+        prompt_tokens = sum(_count_tokens(_message_text(m)) for m in messages)
+
+        if "intent classifier" in system:
+            content = classify_intent_locally(last)
+        elif (body.get("response_format") or {}).get("type") == "json_object":
+            content = json.dumps({"items": {}})
+        elif system:
+            # Document-level prompts (summary, legal analysis) carry their instructions as a system message
+            content = CANNED_REPORT
+        else:
+            content = CANNED_ANSWER
+
+        self.delay(self.latency_ms, prompt_tokens)
+        completion_tokens = _count_tokens(content)
+        return {
+            "id": f"chatcmpl-mock-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": self.cached_tokens(messages)},
+            },
+        }
+
+    def embeddings(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        inputs = body.get("input", [])
+        # A single string, a list of strings, one token list or a list of token lists
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        self.delay(self.embedding_latency_ms)
+
+        data = []
+        for i, item in enumerate(inputs):
+            vector = embed(item)
+            if body.get("encoding_format") == "base64":
+                encoded: Any = base64.b64encode(vector.astype("<f4").tobytes()).decode()
+            else:
+                encoded = vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": encoded})
+        tokens = sum(len(item) if isinstance(item, list) else _count_tokens(str(item)) for item in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "mock-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+
+def _make_handler(mock: MockOpenAI):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, payload: Dict[str, Any]):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not mock.admit():
+                self._send(429, {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error"}})
+                return
+            try:
+                if self.path.endswith("/chat/completions"):
+                    self._send(200, mock.chat_completion(body))
+                elif self.path.endswith("/embeddings"):
+                    self._send(200, mock.embeddings(body))
+                else:
+                    self._send(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+            finally:
+                mock.release()
+
+    return Handler
+
+
+class MockOpenAIServer:
+    """The mock on a background thread; use as a context manager"""
+
+    def __init__(self, mock: Optional[MockOpenAI] = None, host: str = "127.0.0.1", port: int = 0):
+        self.mock = mock or MockOpenAI()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self.mock))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "MockOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Median chat completion latency")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Log-normal sigma of the latency (0 = fixed)")
+    parser.add_argument("--per-1k-prompt-tokens-ms", type=float, default=40.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=80.0)
+    parser.add_argument("--max-in-flight", type=int, default=0, help="Answer 429 above this many requests (0 = off)")
+    args = parser.parse_args()
+
+    mock = MockOpenAI(args.latency_ms, args.jitter, args.per_1k_prompt_tokens_ms,
+                      args.embedding_latency_ms, args.max_in_flight)
+    with MockOpenAIServer(mock, port=args.port) as server:
+        print(f"🧪 Mock OpenAI listening on {server.base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
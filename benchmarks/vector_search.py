@@ -0,0 +1,122 @@
+"""Exact NumPy search vs FAISS for document-sized indexes.
+
+Times index build plus a batch of top-k queries for each backend over random
+unit vectors (no API calls), and reports the chunk count at which FAISS
+starts to win. Use the result to tune NUMPY_INDEX_MAX_CHUNKS in retrieval.py.
+
+    python benchmarks/vector_search.py
+    python benchmarks/vector_search.py --sizes 10 60 1000 10000 --queries 20
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_index import NumpyVectorIndex  # noqa: E402
+
+DIMENSIONS = 1536  # OpenAI text-embedding-ada-002 / text-embedding-3-small
+DEFAULT_SIZES = [10, 30, 60, 100, 300, 1000, 3000, 10000, 30000]
+
+
+class _Doc:
+    """Minimal stand-in for a LangChain Document"""
+    __slots__ = ("page_content", "metadata")
+
+    def __init__(self, i: int):
+        self.page_content = f"chunk {i}"
+        self.metadata = {}
+
+
+class _PrecomputedEmbeddings:
+    """Embeddings object that hands back precomputed vectors, so no time is spent embedding"""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.vectors[:len(texts)]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.vectors[0]
+
+
+def best_of(fn: Callable[[], None], repeats: int) -> float:
+    """Best wall time in milliseconds over several runs"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def bench_numpy(docs, vectors, queries, k: int) -> Callable[[], None]:
+    """Exact NumPy index, as used by the analyzer up to the threshold"""
+    def run():
+        index = NumpyVectorIndex(docs, vectors, embedding=None)
+        for query in queries:
+            index.max_marginal_relevance_search_with_score_by_vector(query, k=k, fetch_k=k * 4)
+    return run
+
+
+def bench_faiss(docs, vectors, queries, k: int) -> Optional[Callable[[], None]]:
+    """LangChain FAISS vectorstore, as used by the analyzer above the threshold"""
+    try:
+        from langchain_community.vectorstores import FAISS
+    except ImportError:
+        return None
+
+    embeddings = _PrecomputedEmbeddings(vectors)
+    text_embeddings = [(doc.page_content, vector) for doc, vector in zip(docs, vectors)]
+
+    def run():
+        store = FAISS.from_embeddings(text_embeddings, embedding=embeddings)
+        for query in queries:
+            store.max_marginal_relevance_search_with_score_by_vector(query, k=k, fetch_k=k * 4)
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Chunk counts to test")
+    parser.add_argument("--queries", type=int, default=10, help="Queries per index build")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'chunks':>8} {'numpy ms':>10} {'faiss ms':>10}  winner")
+
+    crossover, compared = None, False
+    for size in args.sizes:
+        vectors = rng.standard_normal((size, DIMENSIONS), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        queries = rng.standard_normal((args.queries, DIMENSIONS), dtype=np.float32)
+        docs = [_Doc(i) for i in range(size)]
+
+        numpy_ms = best_of(bench_numpy(docs, vectors, queries, args.k), args.repeats)
+        faiss_run = bench_faiss(docs, vectors, queries, args.k)
+        if faiss_run is None:
+            print(f"{size:>8} {numpy_ms:>10.2f} {'n/a':>10}  (faiss not installed)")
+            continue
+
+        compared = True
+        faiss_ms = best_of(faiss_run, args.repeats)
+        winner = "numpy" if numpy_ms <= faiss_ms else "faiss"
+        if winner == "faiss" and crossover is None:
+            crossover = size
+        print(f"{size:>8} {numpy_ms:>10.2f} {faiss_ms:>10.2f}  {winner}")
+
+    if crossover is not None:
+        print(f"\nFAISS first wins at {crossover} chunks")
+    elif compared:
+        print("\nNumPy won at every tested size")
+
+
+if __name__ == "__main__":
+    main()
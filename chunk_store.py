@@ -0,0 +1,125 @@
+import hashlib
+import sys
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# A source reference kept in chat messages: (chunk_id, relevance score or None)
+SourceRef = Tuple[str, Optional[float]]
+
+
+class ChunkRecord:
+    """Compact record for one document chunk"""
+    __slots__ = ("chunk_id", "doc_id", "page", "section", "text")
+
+    def __init__(self, chunk_id: str, doc_id: str, page: int, section: str, text: str):
+        self.chunk_id = chunk_id
+        self.doc_id = doc_id
+        self.page = page
+        self.section = section
+        self.text = text
+
+    @property
+    def page_content(self) -> str:
+        """Alias so records can be displayed like LangChain Documents"""
+        return self.text
+
+
+class ChunkStore:
+    """Interned per-document chunk table keyed by chunk id.
+
+    A document's original clause chunks are interned once, when it is split,
+    and tagged with their chunk_id; retrieved (possibly compressed) copies carry
+    that id in their metadata, so chat messages only need (chunk_id, score) pairs
+    and the table does not grow with every answer.
+
+    One store can be shared by every analyzer in the process: documents are
+    keyed by file hash, each analyzer holding a document takes a reference on
+    it, and its chunks are dropped when the last reference is released.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._records: Dict[str, ChunkRecord] = {}
+        self._references: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._records
+
+    @staticmethod
+    def make_chunk_id(doc_id: str, text: str) -> str:
+        """Stable id for a chunk, derived from its document and content"""
+        digest = hashlib.blake2b(f"{doc_id}\x00{text}".encode("utf-8"), digest_size=8)
+        return digest.hexdigest()
+
+    def intern(self, document: Any, doc_id: Optional[str] = None) -> str:
+        """Store a LangChain Document's chunk once and return its chunk id"""
+        metadata = getattr(document, "metadata", {}) or {}
+        doc_id = sys.intern(str(doc_id or metadata.get("doc_id", "current")))
+        text = document.page_content
+        chunk_id = self.make_chunk_id(doc_id, text)
+        with self._lock:
+            if chunk_id not in self._records:
+                self._records[chunk_id] = ChunkRecord(
+                    chunk_id=chunk_id,
+                    doc_id=doc_id,
+                    page=int(metadata.get("page", 0)),
+                    section=sys.intern(str(metadata.get("section", ""))),
+                    text=text
+                )
+        return chunk_id
+
+    def intern_chunks(self, documents: List[Any], doc_id: str) -> List[str]:
+        """Intern a document's original chunks, tag each one's metadata with its chunk_id and take a reference on it"""
+        chunk_ids = []
+        with self._lock:
+            for document in documents:
+                document.metadata["chunk_id"] = self.intern(document, doc_id)
+                chunk_ids.append(document.metadata["chunk_id"])
+            self._references[str(doc_id)] += 1
+        return chunk_ids
+
+    def release(self, doc_id: Optional[str]) -> int:
+        """Drop one reference on a document; its chunks go once nobody holds it. Returns the number removed"""
+        if doc_id is None:
+            return 0
+        doc_id = str(doc_id)
+        with self._lock:
+            if self._references[doc_id] > 1:
+                self._references[doc_id] -= 1
+                return 0
+            del self._references[doc_id]
+            stale = [chunk_id for chunk_id, record in self._records.items() if record.doc_id == doc_id]
+            for chunk_id in stale:
+                del self._records[chunk_id]
+        return len(stale)
+
+    def intern_sources(self, documents: List[Any], doc_id: Optional[str] = None) -> List[SourceRef]:
+        """Compact (chunk_id, score) references for retrieved documents.
+
+        Copies of interned chunks are referenced by their chunk_id; anything
+        untagged is interned as is.
+        """
+        refs = []
+        for document in documents:
+            metadata = getattr(document, "metadata", {}) or {}
+            chunk_id = metadata.get("chunk_id")
+            if chunk_id not in self._records:
+                chunk_id = self.intern(document, doc_id)
+            score = metadata.get("score")
+            refs.append((chunk_id, None if score is None else float(score)))
+        return refs
+
+    def resolve(self, refs: List[SourceRef]) -> List[Tuple[ChunkRecord, Optional[float]]]:
+        """Resolve references back to chunk records, skipping ids no longer stored"""
+        with self._lock:
+            return [(self._records[chunk_id], score) for chunk_id, score in refs if chunk_id in self._records]
+
+    def clear(self):
+        """Drop all stored chunks"""
+        with self._lock:
+            self._records.clear()
+            self._references.clear()
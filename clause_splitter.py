@@ -0,0 +1,244 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+# Size limits are in tokens, so chunks map directly onto embedding cost
+CLAUSE_MAX_TOKENS = 350
+CLAUSE_MIN_TOKENS = 25
+CLAUSE_OVERLAP_TOKENS = 30
+
+# "1.", "4.2", "12)" at the start of a line, followed by text
+NUMBERED_CLAUSE = re.compile(r"^\s*(?P<number>\d{1,2}(?:\.\d{1,2})*)(?P<separator>[.)])?\s+(?P<title>\S.*)$")
+SECTION_NUMBER = re.compile(r"\d{1,2}(?:\.\d{1,2})*")
+# A numbered line whose heading has at most this many words is a heading even if its number is out of sequence
+NUMBERED_HEADING_MAX_WORDS = 8
+# "Article 4", "Section 2.1", "Clause 7 - Term"
+NAMED_CLAUSE = re.compile(r"^\s*(?P<kind>Article|Section|Clause|Schedule|Annex)\s+(?P<number>[0-9IVXivx]+(?:\.\d+)*)\b\s*[.:\-–]?\s*(?P<title>.*)$", re.IGNORECASE)
+
+# Unnumbered headings that commonly open an NDA clause
+KNOWN_HEADINGS = {
+    "definitions", "confidential information", "confidentiality", "confidentiality obligations",
+    "purpose", "permitted disclosure", "permitted disclosures", "exceptions", "term", "duration",
+    "term and termination", "termination", "return of information", "return or destruction",
+    "return or destruction of information", "non-solicitation", "non solicitation", "non-compete",
+    "no licence", "no license", "intellectual property", "remedies", "liability", "penalty",
+    "penalties", "indemnity", "no warranty", "no obligation", "governing law", "jurisdiction",
+    "governing law and jurisdiction", "miscellaneous", "notices", "entire agreement", "assignment",
+}
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.;:!?])\s+(?=[A-Z(\"'])")
+# Text before a heading normally ends a sentence (or a list intro)
+SENTENCE_END = (".", ";", ":", "!", "?")
+
+# Running headers/footers: lines among the first or last few of a page that recur on most pages
+RUNNING_LINE_DEPTH = 2
+RUNNING_LINE_MIN_SHARE = 0.5
+
+
+@lru_cache(maxsize=1)
+def get_token_counter() -> Callable[[str], int]:
+    """Token counter using tiktoken when available, falling back to ~4 characters per token"""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception:
+        return lambda text: max(1, len(text) // 4)
+
+
+def _follows(previous_section: Optional[str], number: str) -> bool:
+    """Whether a clause number continues the numbering of the previous section ("4" -> "5", "4.1", "4.2" -> "4.3" or "5")"""
+    parts = [int(part) for part in number.split(".")]
+    previous = SECTION_NUMBER.search(previous_section or "")
+    if not previous:
+        # Nothing numbered yet: only a first clause ("1", "3", "1.1") can open the numbering
+        return len(parts) == 1 or parts[-1] == 1
+    previous_parts = [int(part) for part in previous.group().split(".")]
+    if parts == previous_parts + [1]:
+        return True
+    return any(parts == previous_parts[:level] + [previous_parts[level] + 1] for level in range(len(previous_parts)))
+
+
+def match_clause_heading(line: str, previous_section: Optional[str] = None,
+                         sentence_ended: bool = True) -> Optional[Tuple[str, str]]:
+    """Return (section, heading) if the line opens a new clause, else None.
+
+    previous_section is the last numbered section seen, used to tell clause
+    numbers from amounts such as "2.5 million euros" at the start of a line.
+    sentence_ended says whether the text before the line ended a sentence; an
+    ALL CAPS line that isn't a known heading only opens a clause if it did.
+    """
+    stripped = line.strip()
+    if not stripped:
+        return None
+
+    named = NAMED_CLAUSE.match(stripped)
+    if named:
+        section = f"{named.group('kind').title()} {named.group('number')}"
+        return section, (named.group("title") or "").strip()
+
+    # A bare "30 days ..." is wrapped text, so require "1." / "1)" or a dotted "1.1",
+    # followed by a capitalised heading that is either short or correctly numbered
+    numbered = NUMBERED_CLAUSE.match(stripped)
+    if numbered and (numbered.group("separator") or "." in numbered.group("number")):
+        number, title = numbered.group("number"), numbered.group("title").strip()
+        heading = title.split(". ")[0]
+        if title[0].isupper() and (
+            len(heading.split()) <= NUMBERED_HEADING_MAX_WORDS or _follows(previous_section, number)
+        ):
+            return number, heading[:80]
+
+    # Short, unterminated lines that are either ALL CAPS or a known clause name
+    words = stripped.rstrip(":").split()
+    if 0 < len(words) <= 6 and not stripped.endswith((".", ",", ";")):
+        title = stripped.rstrip(":")
+        if title.lower() in KNOWN_HEADINGS or (title.isupper() and len(title) > 3 and sentence_ended):
+            return title.title(), title.title()
+    return None
+
+
+def _running_line_key(line: str) -> str:
+    """Normalise a header/footer line so "Page 2 of 5" and "Page 3 of 5" compare equal"""
+    return re.sub(r"\d+", "#", " ".join(line.split()).lower())
+
+
+def _strip_running_lines(documents: List[Any]) -> List[List[str]]:
+    """Lines of each page, without headers and footers repeated at the top or bottom of most pages"""
+    pages = [document.page_content.splitlines() for document in documents]
+    if len(pages) < 2:
+        return pages
+
+    def edges(lines: List[str]) -> List[str]:
+        content = [line for line in lines if line.strip()]
+        return content[:RUNNING_LINE_DEPTH] + content[-RUNNING_LINE_DEPTH:]
+
+    counts = Counter(key for lines in pages for key in {_running_line_key(line) for line in edges(lines)})
+    min_pages = max(2, math.ceil(RUNNING_LINE_MIN_SHARE * len(pages)))
+    running = {key for key, count in counts.items() if count >= min_pages}
+    if not running:
+        return pages
+
+    stripped = []
+    for lines in pages:
+        edge_lines = set(edges(lines))
+        stripped.append([
+            line for line in lines
+            if not (line in edge_lines and _running_line_key(line) in running)
+        ])
+    return stripped
+
+
+def _segment_pages(documents: List[Any]) -> List[Tuple[str, str, str, int]]:
+    """Cut the pages into (section, heading, text, page_index) clause segments"""
+    segments = []
+    section, heading, lines, start_page = "Preamble", "", [], 0
+    last_numbered = None
+    sentence_ended = True
+
+    for page_index, page_lines in enumerate(_strip_running_lines(documents)):
+        for line in page_lines:
+            match = match_clause_heading(line, last_numbered, sentence_ended)
+            if match:
+                if any(l.strip() for l in lines):
+                    segments.append((section, heading, "\n".join(lines).strip(), start_page))
+                section, heading = match
+                if SECTION_NUMBER.search(section):
+                    last_numbered = section
+                lines, start_page = [], page_index
+                sentence_ended = True
+            elif line.strip():
+                sentence_ended = line.rstrip().endswith(SENTENCE_END)
+            lines.append(line)
+
+    if any(l.strip() for l in lines):
+        segments.append((section, heading, "\n".join(lines).strip(), start_page))
+    return segments
+
+
+def _is_bare_heading(heading: str, text: str) -> bool:
+    """Whether a segment is only its heading line ("NON-SOLICITATION", "7. Non-Solicitation")"""
+    if "\n" in text:
+        return False
+    clause = NAMED_CLAUSE.match(text) or NUMBERED_CLAUSE.match(text)
+    title = clause.group("title") if clause else text
+    return title.strip().rstrip(":.").lower() == heading.strip().rstrip(":.").lower()
+
+
+def _merge_bare_headings(segments: List[Tuple[str, str, str, int]], min_tokens: int,
+                         count_tokens: Callable[[str], int]) -> List[Tuple[str, str, str, int]]:
+    """Glue short bare headings onto the clause below them; short clauses with a body stay on their own"""
+    merged = []
+    pending = None  # segment of a bare heading too short to stand alone
+
+    for section, heading, text, page_index in segments:
+        # The clause below keeps its own number if it has one
+        if pending:
+            pending_section, pending_heading, pending_text, pending_page = pending
+            text = f"{pending_text}\n{text}"
+            if not section[0].isdigit():
+                section, heading = pending_section, pending_heading
+            page_index = pending_page
+            pending = None
+        if _is_bare_heading(heading, text) and count_tokens(text) < min_tokens:
+            pending = (section, heading, text, page_index)
+            continue
+        merged.append((section, heading, text, page_index))
+
+    if pending:
+        merged.append(pending)
+    return merged
+
+
+def _split_long_clause(text: str, max_tokens: int, overlap_tokens: int,
+                       count_tokens: Callable[[str], int]) -> List[str]:
+    """Split an oversized clause on sentence boundaries, carrying at most overlap_tokens forward"""
+    pieces, current, current_tokens = [], [], 0
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        sentence_tokens = count_tokens(sentence)
+        if current and current_tokens + sentence_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            # Carry the last sentence over only if it fits the overlap budget
+            tail = current[-1]
+            current = [tail] if count_tokens(tail) <= overlap_tokens else []
+            current_tokens = sum(count_tokens(s) for s in current)
+        current.append(sentence)
+        current_tokens += sentence_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def split_into_clauses(documents: List[Any], max_tokens: int = CLAUSE_MAX_TOKENS,
+                       min_tokens: int = CLAUSE_MIN_TOKENS,
+                       overlap_tokens: int = CLAUSE_OVERLAP_TOKENS) -> List[Any]:
+    """Split loaded NDA pages into one chunk per clause or sub-clause.
+
+    Numbered clauses ("1.", "4.2"), named ones ("Article 4") and common NDA
+    headings ("Non-Solicitation") start a new chunk tagged with ``section`` and
+    ``heading`` metadata. Clauses longer than ``max_tokens`` are split on
+    sentence boundaries; bare headings shorter than ``min_tokens`` are merged
+    into the clause that follows them.
+    """
+    from langchain_core.documents import Document
+
+    if not documents:
+        return []
+
+    count_tokens = get_token_counter()
+    chunks = []
+
+    segments = _merge_bare_headings(_segment_pages(documents), min_tokens, count_tokens)
+    for section, heading, text, page_index in segments:
+        pieces = [text] if count_tokens(text) <= max_tokens else _split_long_clause(
+            text, max_tokens, overlap_tokens, count_tokens
+        )
+        for part_index, piece in enumerate(pieces):
+            metadata = dict(documents[page_index].metadata)
+            metadata.update({
+                "section": section if len(pieces) == 1 else f"{section} (part {part_index + 1})",
+                "heading": heading,
+            })
+            chunks.append(Document(page_content=piece, metadata=metadata))
+    return chunks
@@ -0,0 +1,139 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Union
+
+# Strada checklist, mirroring the legal analysis prompt: (item id, label, priority, what PASS means)
+COMPLIANCE_CHECKLIST = [
+    ("broad_liability", "Broad liability clauses", "HIGH",
+     "No obligation to compensate both direct AND indirect damages, and no other excessive liability on Strada"),
+    ("non_solicitation", "Non-solicitation", "HIGH",
+     "No non-solicitation, or one lasting at most 12 months that exempts affiliates/portfolio companies, "
+     "unsolicited applications and general advertisements. Put the duration in months in 'value'"),
+    ("information_retention", "Information retention", "HIGH",
+     "Strada may retain secondary information; no clause forbids retaining any confidential information"),
+    ("penalty_clauses", "Penalty clauses", "HIGH",
+     "No monetary penalty amounts for breaches. Put any penalty amount in 'value'"),
+    ("non_compete", "Non-compete", "HIGH", "No restriction on Strada's business activities"),
+    ("ip_transfer", "IP transfer", "HIGH", "No explicit or implicit transfer of intellectual property rights"),
+    ("investment_disclaimer", "Investment disclaimer", "HIGH",
+     "States that the NDA is not a commitment or obligation to invest"),
+    ("disclosee_definition", "Broad disclosee definition", "HIGH",
+     "Disclosees include directors, employees, shareholders, syndicate members, financing providers and advisers"),
+    ("electronic_retention", "Electronic data retention exception", "HIGH",
+     "Return/destruction does not apply to information in automatic electronic archives or backups"),
+    ("regulatory_retention", "Regulatory compliance retention", "HIGH",
+     "Strada may retain information to comply with law, regulators, judicial orders and audits"),
+    ("jurisdiction", "Governing law & jurisdiction", "MEDIUM",
+     "Belgian (preferred) or other European law and courts. Put the governing law in 'value'"),
+    ("term", "Term duration", "MEDIUM",
+     "At most 3 years (5 for healthcare). Put the duration in years in 'value'"),
+    ("reciprocity", "Reciprocity", "MEDIUM", "Obligations apply to both parties and are balanced"),
+]
+
+CHECKLIST_IDS = [item_id for item_id, _, _, _ in COMPLIANCE_CHECKLIST]
+PRIORITIES = {item_id: priority for item_id, _, priority, _ in COMPLIANCE_CHECKLIST}
+
+PASS = "PASS"
+FAIL = "FAIL"
+UNCLEAR = "UNCLEAR"
+STATUSES = (PASS, FAIL, UNCLEAR)
+
+
+def checklist_instructions() -> str:
+    """The checklist as prompt text, one line per item"""
+    return "\n".join(
+        f"- {item_id} ({priority}) {label}: PASS if {criterion}."
+        for item_id, label, priority, criterion in COMPLIANCE_CHECKLIST
+    )
+
+
+def _to_page(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_compliance_response(text: str) -> Dict[str, Dict[str, Any]]:
+    """Parse the model's JSON answer into {item_id: {status, page, value, note}}, filling gaps with UNCLEAR"""
+    try:
+        items = json.loads(text).get("items", {})
+    except (ValueError, AttributeError):
+        items = {}
+    if not isinstance(items, dict):
+        items = {}
+
+    parsed = {}
+    for item_id in CHECKLIST_IDS:
+        item = items.get(item_id) if isinstance(items.get(item_id), dict) else {}
+        status = str(item.get("status", UNCLEAR)).upper()
+        parsed[item_id] = {
+            "status": status if status in STATUSES else UNCLEAR,
+            "page": _to_page(item.get("page")),
+            "value": item.get("value") or None,
+            "note": item.get("note") or "",
+        }
+    return parsed
+
+
+def to_row(doc_id: str, items: Dict[str, Dict[str, Any]], **extra: Any) -> Dict[str, Any]:
+    """Flatten one NDA's checklist into a matrix row: <item>_status/_priority/_page/_value columns"""
+    row: Dict[str, Any] = {"doc_id": doc_id, **extra}
+    failed_high = 0
+    for item_id in CHECKLIST_IDS:
+        item = items[item_id]
+        row[f"{item_id}_status"] = item["status"]
+        row[f"{item_id}_priority"] = PRIORITIES[item_id]
+        row[f"{item_id}_page"] = item["page"]
+        row[f"{item_id}_value"] = item["value"]
+        failed_high += item["status"] == FAIL and PRIORITIES[item_id] == "HIGH"
+    row["high_priority_failures"] = failed_high
+    return row
+
+
+def build_compliance_frame(rows: List[Dict[str, Any]]):
+    """Columnar DataFrame with one row per NDA; status and priority columns are categoricals"""
+    import pandas as pd
+
+    frame = pd.DataFrame(rows)
+    for item_id in CHECKLIST_IDS:
+        if f"{item_id}_status" in frame:
+            frame[f"{item_id}_status"] = pd.Categorical(frame[f"{item_id}_status"], categories=STATUSES)
+            frame[f"{item_id}_priority"] = frame[f"{item_id}_priority"].astype("category")
+            frame[f"{item_id}_page"] = frame[f"{item_id}_page"].astype("Int64")
+    return frame
+
+
+def export_compliance_matrix(rows_or_frame: Union[List[Dict[str, Any]], Any], path: str) -> str:
+    """Write the matrix to Parquet (.parquet) or CSV (anything else); returns the path"""
+    frame = build_compliance_frame(rows_or_frame) if isinstance(rows_or_frame, list) else rows_or_frame
+    if os.path.splitext(path)[1].lower() == ".parquet":
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+    print(f"💾 Compliance matrix written to {path} ({len(frame)} NDAs)")
+    return path
+
+
+def load_compliance_matrix(path: str):
+    """Read a matrix written by export_compliance_matrix"""
+    import pandas as pd
+
+    if os.path.splitext(path)[1].lower() == ".parquet":
+        return pd.read_parquet(path)
+    return build_compliance_frame(pd.read_csv(path).to_dict("records"))
+
+
+def failure_summary(frame, priority: Optional[str] = None):
+    """Per checklist item: how many NDAs fail it, and the failure rate. No LLM calls"""
+    import pandas as pd
+
+    item_ids = [i for i in CHECKLIST_IDS if priority is None or PRIORITIES[i] == priority]
+    statuses = frame[[f"{i}_status" for i in item_ids]]
+    summary = pd.DataFrame({
+        "priority": [PRIORITIES[i] for i in item_ids],
+        "failures": statuses.eq(FAIL).sum().to_numpy(),
+        "unclear": statuses.eq(UNCLEAR).sum().to_numpy(),
+    }, index=item_ids)
+    summary["failure_rate"] = summary["failures"] / max(len(frame), 1)
+    return summary.sort_values("failures", ascending=False)
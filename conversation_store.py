@@ -0,0 +1,105 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), "nda_analyzer_conversations.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    doc_hash TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    intent TEXT,
+    source_refs TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages (session_id, doc_hash, id);
+"""
+
+
+class ConversationStore:
+    """Append-only conversation log in SQLite, keyed by (session id, document hash).
+
+    One row per message; readers fetch only the window they need, so neither the
+    analyzer nor the UI keeps a full copy of the conversation in memory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("NDA_CONVERSATION_DB", DEFAULT_DB_PATH)
+        # One connection shared across Streamlit script threads, serialised by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def append(self, session_id: str, doc_hash: str,
+               messages: List[Tuple[str, str, Optional[str], Optional[list]]]) -> List[int]:
+        """Append (role, content, intent, source_refs) messages atomically; returns their ids"""
+        now = time.time()
+        ids = []
+        with self._lock, self._conn:
+            for role, content, intent, source_refs in messages:
+                cursor = self._conn.execute(
+                    "INSERT INTO messages (session_id, doc_hash, role, content, intent, source_refs, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (session_id, doc_hash, role, content, intent,
+                     json.dumps(source_refs) if source_refs else None, now)
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def load(self, session_id: str, doc_hash: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The most recent messages (all if limit is None), oldest first"""
+        query = "SELECT * FROM messages WHERE session_id = ? AND doc_hash = ? ORDER BY id DESC"
+        params: tuple = (session_id, doc_hash)
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._to_message(row) for row in reversed(rows)]
+
+    def count(self, session_id: str, doc_hash: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE session_id = ? AND doc_hash = ?",
+                (session_id, doc_hash)
+            ).fetchone()[0]
+
+    def intent_counts(self, session_id: str, doc_hash: str) -> Dict[str, int]:
+        """Number of assistant messages per intent"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT COALESCE(intent, 'Unknown'), COUNT(*) FROM messages "
+                "WHERE session_id = ? AND doc_hash = ? AND role = 'assistant' GROUP BY 1 ORDER BY MIN(id)",
+                (session_id, doc_hash)
+            ).fetchall()
+        return {intent: count for intent, count in rows}
+
+    def clear(self, session_id: str, doc_hash: str):
+        """Delete one conversation"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ? AND doc_hash = ?", (session_id, doc_hash))
+
+    @staticmethod
+    def _to_message(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'id': row['id'],
+            'role': row['role'],
+            'content': row['content'],
+            'intent': row['intent'],
+            'source_refs': [tuple(ref) for ref in json.loads(row['source_refs'])] if row['source_refs'] else [],
+            'timestamp': row['created_at'],
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
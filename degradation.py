@@ -0,0 +1,160 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Deque, Dict, Optional
+
+# Seconds each pipeline stage may take before the analyzer falls back
+STAGE_DEADLINES = {
+    "intent": 4.0,
+    "retrieval": 8.0,
+    "generation": 60.0,
+    "index_build": 90.0,
+}
+
+# A second (hedged) attempt fires once a stage runs longer than this percentile of its recent latencies
+HEDGE_PERCENTILE = 95
+# ... but only once enough latencies have been observed to make the percentile meaningful
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+# Local intent rules, used when the intent model is slow or unavailable
+SUMMARY_INTENT = re.compile(r"\b(summar\w*|overview|tl;?dr|gist|outline)\b", re.IGNORECASE)
+LEGAL_INTENT = re.compile(
+    r"\b(legal analysis|analy[sz]e|complian\w*|comply|requirements?|checklist|red flags?|review)\b",
+    re.IGNORECASE
+)
+GENERAL_INTENT = re.compile(
+    r"^\s*(hi|hello|hey|thanks?|thank you|good (morning|afternoon|evening)|bye|ok(ay)?|help)\b[\s!.?]*$",
+    re.IGNORECASE
+)
+
+
+def classify_intent_locally(user_message: str) -> str:
+    """Keyword-based intent, mirroring the categories of the intent classifier prompt"""
+    if GENERAL_INTENT.match(user_message):
+        return "GENERAL"
+    if LEGAL_INTENT.search(user_message):
+        return "LEGAL_ANALYSIS"
+    if SUMMARY_INTENT.search(user_message):
+        return "SUMMARY"
+    return "QUESTION"
+
+
+def stage_deadlines_from_env() -> Dict[str, float]:
+    """STAGE_DEADLINES, overridden by NDA_DEADLINE_<STAGE> environment variables (seconds)"""
+    return {
+        stage: float(os.getenv(f"NDA_DEADLINE_{stage.upper()}", default))
+        for stage, default in STAGE_DEADLINES.items()
+    }
+
+
+class StageTimeout(TimeoutError):
+    """A pipeline stage missed its deadline"""
+
+    def __init__(self, stage: str, deadline: float):
+        super().__init__(f"{stage} exceeded its {deadline:g}s deadline")
+        self.stage = stage
+        self.deadline = deadline
+
+
+class LatencyTracker:
+    """Recent successful latencies per stage, for hedging decisions"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(stage, deque(maxlen=self._window)).append(seconds)
+
+    def percentile(self, stage: str, percentile: float, min_samples: int = HEDGE_MIN_SAMPLES) -> Optional[float]:
+        """Latency percentile of a stage, or None until min_samples have been observed"""
+        with self._lock:
+            samples = sorted(self._samples.get(stage, ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+class DeadlineRunner:
+    """Run pipeline stages under deadlines, with one hedged retry.
+
+    A stage runs on a worker thread while the caller waits at most its
+    deadline, then gets StageTimeout and falls back. If the first attempt is
+    slower than the stage's latency percentile, or fails early, a second
+    attempt starts and the first success wins. Attempts that miss the
+    deadline cannot be cancelled; they finish in the background, bounded by
+    the HTTP client timeouts.
+    """
+
+    def __init__(self, deadlines: Optional[Dict[str, float]] = None,
+                 hedge_percentile: float = HEDGE_PERCENTILE):
+        self.deadlines = {**stage_deadlines_from_env(), **(deadlines or {})}
+        self.hedge_percentile = hedge_percentile
+        self.latencies = LatencyTracker()
+
+    def _start(self, stage: str, fn: Callable[[], Any]) -> Future:
+        """Run one attempt on its own daemon thread, so a hedge never queues behind a stuck attempt"""
+        future: Future = Future()
+
+        def target():
+            future.set_running_or_notify_cancel()
+            start = time.monotonic()
+            try:
+                result = fn()
+            except BaseException as e:
+                future.set_exception(e)
+                return
+            self.latencies.record(stage, time.monotonic() - start)
+            future.set_result(result)
+
+        threading.Thread(target=target, name=f"nda-{stage}", daemon=True).start()
+        return future
+
+    def run(self, stage: str, fn: Callable[[], Any], deadline: Optional[float] = None, hedge: bool = True) -> Any:
+        """Result of fn, or StageTimeout once the deadline (default: the stage's) passes"""
+        deadline = deadline or self.deadlines.get(stage)
+        if not deadline:
+            return fn()
+
+        start = time.monotonic()
+        attempts = [self._start(stage, fn)]
+        hedge_after = self.latencies.percentile(stage, self.hedge_percentile) if hedge else None
+        error: Optional[BaseException] = None
+        failed = []
+
+        while True:
+            for attempt in attempts:
+                if attempt.done():
+                    if attempt.exception() is None:
+                        return attempt.result()
+                    error = attempt.exception()
+                    if attempt not in failed:
+                        failed.append(attempt)
+
+            elapsed = time.monotonic() - start
+            can_hedge = hedge and len(attempts) == 1
+            slow = hedge_after is not None and elapsed >= hedge_after
+            if can_hedge and (slow or error is not None):
+                print(f"🔁 Hedging {stage} ({'slow' if error is None else 'failed'} first attempt)")
+                attempts.append(self._start(stage, fn))
+                can_hedge = False
+            elif all(attempt.done() for attempt in attempts):
+                # Every attempt failed before the deadline
+                raise error
+
+            if elapsed >= deadline:
+                raise StageTimeout(stage, deadline)
+            timeout = deadline - elapsed
+            if can_hedge and hedge_after is not None:
+                timeout = min(timeout, hedge_after - elapsed)
+            # Wait on every attempt not yet seen to fail: one that finished since the
+            # check above makes wait() return at once instead of sleeping to the deadline
+            wait([attempt for attempt in attempts if attempt not in failed], timeout=timeout,
+                 return_when=FIRST_COMPLETED)
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_RESULTS_DIR = os.path.join(tempfile.gettempdir(), "nda_analyzer_jobs")
+# Persisted results older than this are deleted instead of reused
+DEFAULT_RESULT_TTL = 24 * 3600
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """State of a single background job"""
+    __slots__ = ("job_id", "kind", "doc_hash", "status", "result", "error",
+                 "submitted_at", "started_at", "finished_at")
+
+    def __init__(self, job_id: str, kind: str, doc_hash: str):
+        self.job_id = job_id
+        self.kind = kind
+        self.doc_hash = doc_hash
+        self.status = QUEUED
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since submission (or total runtime once finished)"""
+        return (self.finished_at or time.time()) - self.submitted_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        job = cls(data["job_id"], data["kind"], data["doc_hash"])
+        for slot in cls.__slots__:
+            setattr(job, slot, data.get(slot))
+        return job
+
+
+class JobQueue:
+    """Process-wide worker pool for long analyses.
+
+    Jobs are identified by (kind, document hash, params), so identical in-flight
+    submissions share one job, and finished results are persisted to disk so a
+    rerun or reconnect can pick them up by job id. A job counts as failed only
+    if its function raises. Persisted results are reused for result_ttl seconds
+    (0 = never) and deleted once expired.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, results_dir: Optional[str] = None,
+                 result_ttl: Optional[float] = None):
+        if max_workers is None:
+            max_workers = int(os.getenv("NDA_MAX_CONCURRENT_JOBS", DEFAULT_MAX_WORKERS))
+        if result_ttl is None:
+            result_ttl = float(os.getenv("NDA_JOB_RESULT_TTL", DEFAULT_RESULT_TTL))
+        self.max_workers = max_workers
+        self.results_dir = results_dir or os.getenv("NDA_JOB_RESULTS_DIR", DEFAULT_RESULTS_DIR)
+        self.result_ttl = result_ttl
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="nda-job")
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Job] = {}
+        # Finished jobs whose result could not be written to disk, kept until resubmitted
+        self._unpersisted: Dict[str, Job] = {}
+        self.purge_expired()
+
+    @staticmethod
+    def make_job_id(kind: str, doc_hash: str, params: str = "") -> str:
+        """Deterministic job id, so identical requests map to the same job"""
+        digest = hashlib.sha256(f"{kind}\x00{doc_hash}\x00{params}".encode("utf-8")).hexdigest()
+        return f"{kind}-{digest[:16]}"
+
+    def submit(self, kind: str, doc_hash: str, fn: Callable[[], Any], params: str = "",
+               force: bool = False) -> str:
+        """Submit a job and return its id; identical in-flight or finished jobs are reused.
+
+        force=True reruns the job even if a finished result is persisted.
+        """
+        job_id = self.make_job_id(kind, doc_hash, params)
+        with self._lock:
+            if job_id in self._in_flight:
+                return job_id
+            self._unpersisted.pop(job_id, None)
+            if not force:
+                # Reuse a persisted result that hasn't expired; failed jobs are retried
+                finished = self._load(job_id)
+                if finished is not None and finished.status == DONE and not self._expired(finished):
+                    return job_id
+
+            job = Job(job_id, kind, doc_hash)
+            self._in_flight[job_id] = job
+        self._executor.submit(self._run, job, fn)
+        print(f"🧵 Queued job {job_id}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job: in-flight jobs from memory, finished ones from disk"""
+        with self._lock:
+            job = self._in_flight.get(job_id) or self._unpersisted.get(job_id)
+        if job is not None:
+            return job
+        return self._load(job_id)
+
+    def in_flight_count(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def _run(self, job: Job, fn: Callable[[], Any]):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn()
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        job.finished_at = time.time()
+
+        # Persist before leaving the in-flight table, so the job is never unreachable;
+        # if that fails it stays readable from memory, but a resubmit runs it again
+        persisted = False
+        try:
+            self._persist(job)
+            persisted = True
+        except (OSError, TypeError, ValueError) as e:
+            print(f"❌ Error persisting job {job.job_id}: {str(e)}")
+        finally:
+            with self._lock:
+                self._in_flight.pop(job.job_id, None)
+                if not persisted:
+                    self._unpersisted[job.job_id] = job
+        print(f"✅ Job {job.job_id} {job.status} in {job.elapsed:.1f}s")
+
+    def _expired(self, job: Job) -> bool:
+        return time.time() - (job.finished_at or 0) >= self.result_ttl
+
+    def purge_expired(self) -> int:
+        """Delete expired results from disk, so stale analyses (which quote NDA text) don't pile up"""
+        removed = 0
+        for name in os.listdir(self.results_dir):
+            if not name.endswith(".json"):
+                continue
+            job = self._load(name[:-len(".json")])
+            if job is not None and job.is_finished and self._expired(job):
+                try:
+                    os.remove(self._result_path(job.job_id))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        try:
+            with open(self._result_path(job_id), "r", encoding="utf-8") as f:
+                return Job.from_dict(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def _persist(self, job: Job):
+        path = self._result_path(job.job_id)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(job.to_dict(), f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _result_path(self, job_id: str) -> str:
+        return os.path.join(self.results_dir, f"{job_id}.json")
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
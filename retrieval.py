@@ -0,0 +1,159 @@
+import math
+import re
+from collections import Counter
+from typing import Any, List, Set, Tuple
+
+from clause_splitter import SENTENCE_BOUNDARY, get_token_counter
+
+# Token budget for the compressed context handed to the QA prompt
+COMPRESSION_TOKEN_BUDGET = 600
+
+# Documents up to this size are answered from their full text, without embeddings
+FULL_TEXT_TOKEN_BUDGET = 3000
+
+# Up to this many chunks retrieval uses an exact NumPy index (vector_index.py) instead of FAISS.
+# 5000 is an unmeasured starting point, well above a typical NDA's chunk count; run
+# benchmarks/vector_search.py on the deployment hardware and set it to the reported crossover.
+NUMPY_INDEX_MAX_CHUNKS = 5000
+
+# Retrieved chunks must score at least MIN_RELEVANCE and be within RELEVANCE_MARGIN of the best one
+MIN_RELEVANCE = 0.25
+RELEVANCE_MARGIN = 0.15
+# MMR trade-off between relevance (1.0) and diversity (0.0)
+MMR_LAMBDA = 0.7
+
+# Questions that need several clauses rather than one fact
+BROAD_QUERY = re.compile(
+    r"\b(all|every|each|list|any|overall|summar\w*|compar\w*|obligations|restrictions|"
+    r"clauses|provisions|issues|concern\w*|risks?|exceptions)\b",
+    re.IGNORECASE
+)
+
+WORD = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+STOPWORDS = {
+    "a", "an", "and", "any", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from",
+    "has", "have", "how", "i", "if", "in", "is", "it", "its", "may", "of", "on", "or", "our",
+    "shall", "should", "such", "that", "the", "their", "there", "this", "to", "was", "we",
+    "what", "when", "where", "which", "who", "whom", "why", "will", "with", "would", "you",
+    "nda", "agreement", "document", "please", "tell", "me", "about",
+}
+
+
+def _normalize(word: str) -> str:
+    """Very small stemmer, enough to match 'parties'/'party' and 'obligations'/'obligation'"""
+    for suffix, replacement in (("ies", "y"), ("ing", ""), ("ed", ""), ("s", "")):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def content_terms(text: str) -> List[str]:
+    """Lower-cased, stemmed content words of a text"""
+    return [_normalize(w) for w in WORD.findall(text.lower()) if w not in STOPWORDS]
+
+
+def choose_k(question: str, n_chunks: int) -> int:
+    """Retrieval depth from the query type and the document length"""
+    base = 6 if BROAD_QUERY.search(question) else 3
+    # Longer documents spread a topic over more clauses
+    return max(1, min(base + n_chunks // 40, n_chunks))
+
+
+def filter_by_relevance(scored: List[Tuple[Any, float]], min_relevance: float = MIN_RELEVANCE,
+                        margin: float = RELEVANCE_MARGIN) -> List[Tuple[Any, float]]:
+    """Drop weak matches, always keeping the best one"""
+    if not scored:
+        return []
+    best = max(score for _, score in scored)
+    cutoff = max(min_relevance, best - margin)
+    return [(doc, score) for doc, score in scored if score >= cutoff] or [max(scored, key=lambda x: x[1])]
+
+
+def keyword_search(query: str, documents: List[Any], k: int) -> List[Any]:
+    """Rank chunks by IDF-weighted term overlap with the query, without embeddings.
+
+    Fallback for when the embeddings API is slow or the index is not built yet.
+    """
+    query_terms = set(content_terms(query))
+    chunk_terms = [set(content_terms(doc.page_content)) for doc in documents]
+    document_frequency = Counter(term for terms in chunk_terms for term in terms & query_terms)
+    idf = {term: math.log(1 + len(documents) / (1 + df)) for term, df in document_frequency.items()}
+
+    scored = [
+        (sum(idf.get(term, 0.0) for term in terms & query_terms), -i, doc)
+        for i, (doc, terms) in enumerate(zip(documents, chunk_terms))
+    ]
+    ranked = [doc for score, _, doc in sorted(scored, key=lambda x: x[:2], reverse=True) if score > 0]
+    # With no overlap at all, the opening clauses are the best guess
+    return (ranked or list(documents))[:k]
+
+
+def compress_documents(query: str, documents: List[Any],
+                       token_budget: int = COMPRESSION_TOKEN_BUDGET) -> List[Any]:
+    """Keep only the sentences of retrieved chunks that are most relevant to the query.
+
+    Sentences are scored by IDF-weighted term overlap with the query (IDF taken
+    over the retrieved sentences) and kept, best first, until the token budget
+    is spent. Kept sentences stay in their original order inside each chunk, and
+    chunks with nothing left are dropped. Purely local; no LLM calls.
+    """
+    from langchain_core.documents import Document
+
+    count_tokens = get_token_counter()
+    query_terms: Set[str] = set(content_terms(query))
+
+    # (doc_index, sentence_index, sentence, terms)
+    sentences = []
+    for doc_index, document in enumerate(documents):
+        for sentence_index, sentence in enumerate(SENTENCE_BOUNDARY.split(document.page_content)):
+            if sentence.strip():
+                sentences.append((doc_index, sentence_index, sentence, set(content_terms(sentence))))
+    if not sentences:
+        return documents
+
+    document_frequency = Counter(term for *_, terms in sentences for term in terms & query_terms)
+    idf = {term: math.log(1 + len(sentences) / (1 + df)) for term, df in document_frequency.items()}
+
+    overlap = {}
+    for doc_index, sentence_index, _, terms in sentences:
+        overlap[(doc_index, sentence_index)] = sum(idf.get(term, 0.0) for term in terms & query_terms)
+
+    def score(entry) -> float:
+        doc_index, sentence_index, _, _ = entry
+        # Neighbours of a matching sentence get half credit, since clauses often
+        # name the subject in one sentence and qualify it in the next
+        neighbour = max(overlap.get((doc_index, sentence_index - 1), 0.0),
+                        overlap.get((doc_index, sentence_index + 1), 0.0))
+        relevance = overlap[(doc_index, sentence_index)] + 0.5 * neighbour
+        # Ties (and queries with no content terms) favour higher-ranked chunks and earlier sentences
+        return relevance - 0.01 * doc_index - 0.001 * sentence_index
+
+    # Once anything matches the query, sentences with no relevance at all are dropped
+    has_matches = any(value > 0 for value in overlap.values())
+
+    kept = {}
+    used_tokens = 0
+    for entry in sorted(sentences, key=score, reverse=True):
+        if has_matches and kept and score(entry) <= 0:
+            break
+        sentence_tokens = count_tokens(entry[2])
+        if kept and used_tokens + sentence_tokens > token_budget:
+            continue
+        # The single best sentence is always kept, even if it alone exceeds the budget
+        kept[(entry[0], entry[1])] = entry[2]
+        used_tokens += sentence_tokens
+
+    compressed = []
+    for doc_index, document in enumerate(documents):
+        sentence_indices = sorted(key[1] for key in kept if key[0] == doc_index)
+        if not sentence_indices:
+            continue
+
+        # Mark the gaps where sentences were dropped
+        text = kept[(doc_index, sentence_indices[0])]
+        for previous, current in zip(sentence_indices, sentence_indices[1:]):
+            text += (" " if current == previous + 1 else " ... ") + kept[(doc_index, current)]
+        metadata = dict(document.metadata)
+        metadata["compressed"] = True
+        compressed.append(Document(page_content=text, metadata=metadata))
+    return compressed
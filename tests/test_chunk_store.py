@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from chunk_store import ChunkStore
+
+
+def chunk(text, **metadata):
+    return SimpleNamespace(page_content=text, metadata={"page": 0, **metadata})
+
+
+def test_retrieved_copies_reference_the_interned_chunk():
+    store = ChunkStore()
+    originals = [chunk("The term is two years.", section="5"), chunk("Belgian law applies.", section="9")]
+    chunk_ids = store.intern_chunks(originals, doc_id="hash-a")
+
+    # A compressed copy keeps the original's metadata, so it adds nothing to the table
+    excerpt = chunk("two years", **{**originals[0].metadata, "score": 0.8})
+    assert store.intern_sources([excerpt]) == [(chunk_ids[0], 0.8)]
+    assert len(store) == 2
+
+    (record, score), = store.resolve([(chunk_ids[0], 0.8)])
+    assert record.page_content == "The term is two years." and record.section == "5" and score == 0.8
+
+
+def test_chunk_ids_are_stable_per_document():
+    first, second = ChunkStore(), ChunkStore()
+    assert first.intern_chunks([chunk("Clause")], "hash-a") == second.intern_chunks([chunk("Clause")], "hash-a")
+    assert first.intern_chunks([chunk("Clause")], "hash-b") != second.intern_chunks([chunk("Clause")], "hash-a")
+
+
+def test_chunks_are_dropped_when_the_last_holder_releases():
+    store = ChunkStore()
+    # Two sessions on the same NDA, one on another
+    store.intern_chunks([chunk("Shared clause")], "hash-a")
+    store.intern_chunks([chunk("Shared clause")], "hash-a")
+    store.intern_chunks([chunk("Other clause")], "hash-b")
+    assert len(store) == 2
+
+    assert store.release("hash-a") == 0
+    assert len(store) == 2
+    assert store.release("hash-a") == 1
+    assert len(store) == 1
+    assert store.release(None) == 0
+
+
+def test_unknown_refs_are_skipped():
+    store = ChunkStore()
+    assert store.resolve([("missing", 0.5)]) == []
@@ -0,0 +1,127 @@
+from types import SimpleNamespace
+
+import pytest
+
+from clause_splitter import _merge_bare_headings, _segment_pages, match_clause_heading
+
+
+def pages(*texts):
+    """Minimal stand-ins for loaded PDF pages"""
+    return [SimpleNamespace(page_content=text, metadata={"page": i}) for i, text in enumerate(texts)]
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def clauses(*texts, min_tokens=25):
+    return _merge_bare_headings(_segment_pages(pages(*texts)), min_tokens, count_words)
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("1. Definitions", ("1", "Definitions")),
+    ("4.2 Exceptions", ("4.2", "Exceptions")),
+    ("12) Notices", ("12", "Notices")),
+    ("Article 4 - Term", ("Article 4", "Term")),
+    ("NON-SOLICITATION", ("Non-Solicitation", "Non-Solicitation")),
+    ("Governing law:", ("Governing Law", "Governing Law")),
+    ("4. Governing law. This Agreement is governed by Belgian law.", ("4", "Governing law")),
+])
+def test_match_clause_heading(line, expected):
+    assert match_clause_heading(line) == expected
+
+
+@pytest.mark.parametrize("line, previous_section", [
+    ("30 days after termination", None),
+    ("2.5 million euros shall not be exceeded in any event.", "2"),
+    ("2.5 Million euros shall not be exceeded by the aggregate liability of the parties.", "2"),
+    ("the receiving party shall keep all information confidential.", None),
+])
+def test_numbers_in_running_text_are_not_headings(line, previous_section):
+    assert match_clause_heading(line, previous_section) is None
+
+
+@pytest.mark.parametrize("line, previous_section", [
+    ("5. The Recipient shall return all Confidential Information upon request of the Discloser.", "4"),
+    ("4.3 The Recipient shall return all Confidential Information upon request of the Discloser.", "4.2"),
+    ("4.1 The Recipient shall return all Confidential Information upon request of the Discloser.", "4"),
+])
+def test_long_numbered_clause_in_sequence_is_a_heading(line, previous_section):
+    assert match_clause_heading(line, previous_section)[0] == line.split()[0].rstrip(".")
+
+
+def test_long_numbered_clause_out_of_sequence_is_not_a_heading():
+    line = "7.4 The Recipient shall return all Confidential Information upon request of the Discloser."
+    assert match_clause_heading(line, "2") is None
+
+
+def test_amount_stays_in_its_clause():
+    segments = clauses(
+        "2. Liability\nThe liability of each party is capped.\n"
+        "2.5 million euros shall not be exceeded in any event.\n3. Term\nTwo years."
+    )
+    assert [(section, heading) for section, heading, _, _ in segments] == [("2", "Liability"), ("3", "Term")]
+    assert "2.5 million euros" in segments[0][2]
+
+
+def test_short_numbered_clauses_keep_their_own_number():
+    segments = clauses(
+        "2. Term\nThis agreement lasts 2 years.\n"
+        "3. Non-Solicitation\nThe Recipient shall not solicit employees of the Discloser.\n"
+        "4. Governing law. This Agreement is governed by Belgian law.\n"
+        "5. Notices\nNotices are sent by registered mail."
+    )
+    assert [(section, heading) for section, heading, _, _ in segments] == [
+        ("2", "Term"), ("3", "Non-Solicitation"), ("4", "Governing law"), ("5", "Notices"),
+    ]
+    assert segments[0][2] == "2. Term\nThis agreement lasts 2 years."
+    assert "Belgian law" in segments[2][2]
+
+
+def test_bare_heading_merges_into_next_clause():
+    segments = clauses(
+        "NON-SOLICITATION\n7. The Recipient shall not solicit employees of the Discloser.",
+        "CONFIDENTIALITY\nThe Recipient shall keep the information secret.",
+    )
+    assert [(section, heading) for section, heading, _, _ in segments] == [
+        ("7", "The Recipient shall not solicit employees of the Discloser."),
+        ("Confidentiality", "Confidentiality"),
+    ]
+    assert segments[0][2].startswith("NON-SOLICITATION\n7. The Recipient")
+
+
+def test_bare_numbered_heading_merges_into_first_sub_clause():
+    segments = clauses("7. Non-Solicitation\n7.1 The Recipient shall not solicit employees.")
+    assert len(segments) == 1
+    assert segments[0][0] == "7.1"
+    assert segments[0][2] == "7. Non-Solicitation\n7.1 The Recipient shall not solicit employees."
+
+
+def test_trailing_bare_heading_is_kept():
+    segments = clauses("1. Definitions\nWords have meanings.\nSCHEDULE")
+    assert segments[-1][:3] == ("Schedule", "Schedule", "SCHEDULE")
+
+
+def test_running_header_does_not_split_a_clause():
+    segments = clauses(
+        "STRICTLY CONFIDENTIAL\n4. Purpose\nThe information is used only for the deal.\n"
+        "5. Confidentiality\nThe Recipient shall keep the information secret and shall not\nPage 1 of 3",
+        "STRICTLY CONFIDENTIAL\ndisclose it to any third party without consent.\n6. Term\nTwo years.\nPage 2 of 3",
+        "STRICTLY CONFIDENTIAL\n7. Notices\nNotices are sent by registered mail.\nPage 3 of 3",
+    )
+    assert [section for section, _, _, _ in segments] == ["4", "5", "6", "7"]
+    assert segments[1][2] == (
+        "5. Confidentiality\nThe Recipient shall keep the information secret and shall not\n"
+        "disclose it to any third party without consent."
+    )
+    assert not any("STRICTLY CONFIDENTIAL" in text or "Page" in text for _, _, text, _ in segments)
+
+
+def test_caps_line_mid_sentence_is_not_a_heading():
+    assert match_clause_heading("ACME HOLDINGS LIMITED", sentence_ended=False) is None
+    assert match_clause_heading("ACME HOLDINGS LIMITED") == ("Acme Holdings Limited", "Acme Holdings Limited")
+    # Known clause names still open a clause anywhere
+    assert match_clause_heading("GOVERNING LAW", sentence_ended=False) == ("Governing Law", "Governing Law")
+
+    segments = clauses("1. Parties\nThis agreement is made between\nACME HOLDINGS LIMITED\nand the Recipient.")
+    assert len(segments) == 1 and segments[0][0] == "1"
@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from compliance_matrix import CHECKLIST_IDS, FAIL, PASS, UNCLEAR, parse_compliance_response, to_row
+
+
+def test_parse_fills_missing_items_with_unclear():
+    parsed = parse_compliance_response(json.dumps({"items": {
+        "term": {"status": "pass", "page": "3", "value": "2 years"},
+        "non_compete": {"status": "FAIL", "page": None},
+    }}))
+    assert set(parsed) == set(CHECKLIST_IDS)
+    assert parsed["term"] == {"status": PASS, "page": 3, "value": "2 years", "note": ""}
+    assert parsed["non_compete"]["status"] == FAIL
+    assert parsed["jurisdiction"]["status"] == UNCLEAR
+
+
+@pytest.mark.parametrize("text", ["not json", "[1, 2]", '{"items": []}', '{"items": "none"}', '{"items": null}'])
+def test_parse_tolerates_malformed_answers(text):
+    parsed = parse_compliance_response(text)
+    assert all(item["status"] == UNCLEAR for item in parsed.values())
+
+
+def test_to_row_counts_high_priority_failures():
+    parsed = parse_compliance_response(json.dumps({"items": {
+        "non_compete": {"status": "FAIL"}, "term": {"status": "FAIL"},
+    }}))
+    row = to_row("acme", parsed, document_hash="abc")
+    assert row["doc_id"] == "acme" and row["document_hash"] == "abc"
+    # non_compete is HIGH priority, term is MEDIUM
+    assert row["high_priority_failures"] == 1
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from degradation import DeadlineRunner, StageTimeout, classify_intent_locally
+
+
+def make_runner(**deadlines):
+    return DeadlineRunner(deadlines=deadlines)
+
+
+def test_returns_result_within_deadline():
+    assert make_runner(generation=1.0).run("generation", lambda: "answer") == "answer"
+
+
+def test_stage_without_deadline_runs_inline():
+    runner = make_runner()
+    runner.deadlines.pop("custom", None)
+    assert runner.run("custom", threading.current_thread) is threading.current_thread()
+
+
+def test_missed_deadline_raises_stage_timeout_promptly():
+    release = threading.Event()
+    start = time.monotonic()
+    with pytest.raises(StageTimeout) as excinfo:
+        make_runner(retrieval=0.1).run("retrieval", lambda: release.wait(5), hedge=False)
+    release.set()
+    assert time.monotonic() - start < 1.0
+    assert excinfo.value.stage == "retrieval" and excinfo.value.deadline == 0.1
+
+
+def test_failed_first_attempt_is_hedged():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("reset")
+        return "second try"
+
+    assert make_runner(generation=2.0).run("generation", flaky) == "second try"
+    assert len(attempts) == 2
+
+
+def test_error_without_hedge_is_raised():
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        make_runner(generation=2.0).run("generation", failing, hedge=False)
+    assert len(attempts) == 1
+
+
+def test_every_attempt_failing_raises_before_the_deadline():
+    start = time.monotonic()
+    with pytest.raises(ConnectionError):
+        make_runner(generation=5.0).run("generation", lambda: (_ for _ in ()).throw(ConnectionError("down")))
+    assert time.monotonic() - start < 1.0
+
+
+def test_slow_attempt_is_hedged_after_the_latency_percentile():
+    runner = make_runner(generation=3.0)
+    for _ in range(30):
+        runner.latencies.record("generation", 0.01)
+
+    release, attempts = threading.Event(), []
+
+    def sometimes_stuck():
+        attempts.append(1)
+        if len(attempts) == 1:
+            release.wait(5)
+            return "stuck"
+        return "hedged"
+
+    start = time.monotonic()
+    assert runner.run("generation", sometimes_stuck) == "hedged"
+    release.set()
+    assert time.monotonic() - start < 1.0
+    assert len(attempts) == 2
+
+
+def test_no_hedge_before_enough_samples():
+    runner = make_runner(generation=0.3)
+    attempts = []
+
+    def slow():
+        attempts.append(1)
+        time.sleep(0.5)
+
+    with pytest.raises(StageTimeout):
+        runner.run("generation", slow)
+    assert len(attempts) == 1
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("hello!", "GENERAL"),
+    ("Can you summarize this NDA?", "SUMMARY"),
+    ("Does this NDA comply with our firm's requirements?", "LEGAL_ANALYSIS"),
+    ("Who are the parties?", "QUESTION"),
+])
+def test_local_intent_rules(message, intent):
+    assert classify_intent_locally(message) == intent
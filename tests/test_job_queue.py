@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from job_queue import DONE, FAILED, JobQueue
+
+
+def wait_finished(queue, job_id, timeout=2.0):
+    """The finished job, once it has also been persisted and left the in-flight table"""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = queue.get(job_id)
+        if job is not None and job.is_finished and not queue.in_flight_count():
+            return job
+        assert time.monotonic() < deadline, "job did not finish in time"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(**kwargs):
+        queue = JobQueue(results_dir=str(tmp_path), **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.shutdown()
+
+
+def test_finished_result_is_persisted_and_reused(make_queue):
+    calls = []
+    queue = make_queue()
+    job_id = queue.submit("summary", "hash", lambda: calls.append(1) or "result", params="gpt-4o")
+    job = wait_finished(queue, job_id)
+    assert job.status == DONE and job.result == "result"
+
+    # A new queue (e.g. after a restart) reuses the persisted result without running again
+    restarted = make_queue()
+    assert restarted.submit("summary", "hash", lambda: calls.append(1), params="gpt-4o") == job_id
+    assert restarted.get(job_id).result == "result"
+    assert len(calls) == 1
+
+
+def test_failed_job_is_marked_failed_and_retried(make_queue):
+    queue = make_queue()
+    job_id = queue.submit("summary", "hash", lambda: (_ for _ in ()).throw(RuntimeError("timeout")))
+    job = wait_finished(queue, job_id)
+    assert job.status == FAILED and job.error == "timeout" and job.result is None
+
+    assert queue.submit("summary", "hash", lambda: "ok") == job_id
+    assert wait_finished(queue, job_id).result == "ok"
+
+
+def test_identical_in_flight_jobs_are_deduplicated(make_queue):
+    queue = make_queue()
+    release, calls = threading.Event(), []
+
+    def fn():
+        calls.append(1)
+        release.wait(2)
+        return "done"
+
+    first = queue.submit("legal_analysis", "hash", fn)
+    second = queue.submit("legal_analysis", "hash", fn, force=True)
+    other = queue.submit("legal_analysis", "other-hash", lambda: "other")
+    assert first == second != other
+    release.set()
+    assert wait_finished(queue, first).result == "done"
+    assert len(calls) == 1
+
+
+def test_force_reruns_a_finished_job(make_queue):
+    queue = make_queue()
+    job_id = queue.submit("summary", "hash", lambda: "old")
+    wait_finished(queue, job_id)
+    queue.submit("summary", "hash", lambda: "new", force=True)
+    assert wait_finished(queue, job_id).result in ("old", "new")
+    queue.shutdown()
+    assert queue.get(job_id).result == "new"
+
+
+def test_zero_ttl_never_reuses_but_result_stays_readable(make_queue):
+    queue = make_queue(result_ttl=0)
+    assert queue.result_ttl == 0
+    calls = []
+    job_id = queue.submit("summary", "hash", lambda: calls.append(1) or len(calls))
+    assert wait_finished(queue, job_id).result == 1
+    queue.submit("summary", "hash", lambda: calls.append(1) or len(calls))
+    queue.shutdown()
+    assert queue.get(job_id).result == 2
+
+
+def test_expired_results_are_purged_on_start(make_queue, tmp_path):
+    queue = make_queue()
+    job_id = queue.submit("summary", "hash", lambda: "result")
+    wait_finished(queue, job_id)
+    path = os.path.join(str(tmp_path), f"{job_id}.json")
+    with open(path) as f:
+        data = json.load(f)
+    data["finished_at"] -= 3600
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+    make_queue(result_ttl=60)
+    assert not os.path.exists(path)
+
+
+def test_unpersistable_result_does_not_stay_in_flight(make_queue):
+    queue = make_queue()
+    job_id = queue.submit("summary", "hash", object)  # not JSON serialisable
+    job = wait_finished(queue, job_id)
+    assert job.status == DONE
+    assert queue.in_flight_count() == 0
+
+    # A resubmit runs again instead of returning the stale job
+    assert queue.submit("summary", "hash", lambda: "ok") == job_id
+    assert wait_finished(queue, job_id).result == "ok"
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+def run_concurrently(flight, key, fn, callers):
+    """Start callers threads on the same key once the leader is running; returns (results, errors)"""
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_callers_share_one_result():
+    flight, release, calls = SingleFlight(), threading.Event(), []
+
+    def fn():
+        calls.append(1)
+        release.wait(2)
+        return "summary"
+
+    threads, results, errors = run_concurrently(flight, "k", fn, 5)
+    wait_for(lambda: "k" in flight._calls and flight._calls["k"].waiters == 4)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert len(calls) == 1
+    assert results == ["summary"] * 5 and not errors
+    assert flight.in_flight() == 0
+
+
+def test_leader_error_is_raised_to_every_follower():
+    flight, release = SingleFlight(), threading.Event()
+
+    def fn():
+        release.wait(2)
+        raise ValueError("provider down")
+
+    threads, results, errors = run_concurrently(flight, "k", fn, 3)
+    wait_for(lambda: "k" in flight._calls and flight._calls["k"].waiters == 2)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert not results
+    assert len(errors) == 3 and all(str(e) == "provider down" for e in errors)
+    assert flight.in_flight() == 0
+
+
+def test_results_are_not_cached_after_completion():
+    flight, calls = SingleFlight(), []
+    for _ in range(2):
+        flight.do("k", lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_none_key_disables_deduplication():
+    flight, calls = SingleFlight(), []
+    assert flight.do(None, lambda: calls.append(1) or "x") == "x"
+    assert flight.in_flight() == 0
+
+
+def test_failed_leader_frees_the_key():
+    flight = SingleFlight()
+    with pytest.raises(RuntimeError):
+        flight.do("k", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+    assert flight.do("k", lambda: 42) == 42
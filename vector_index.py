@@ -0,0 +1,84 @@
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+class NumpyVectorIndex:
+    """Exact in-process vector search for small documents.
+
+    All embeddings live in one contiguous, L2-normalised float32 matrix, so a
+    query is a single matrix-vector product plus ``argpartition``. Search
+    methods mirror the LangChain FAISS vectorstore and return squared L2
+    distances, so callers can treat both backends alike.
+    """
+
+    def __init__(self, documents: List[Any], vectors: np.ndarray, embedding: Any):
+        self.documents = documents
+        self.matrix = self._normalize(np.ascontiguousarray(vectors, dtype=np.float32))
+        self.embedding = embedding
+
+    @classmethod
+    def from_documents(cls, documents: List[Any], embedding: Any) -> "NumpyVectorIndex":
+        """Embed documents in one batched request and build the index"""
+        vectors = embedding.embed_documents([doc.page_content for doc in documents])
+        return cls(list(documents), np.asarray(vectors, dtype=np.float32), embedding)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _top_k(self, query_vector: Any, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and cosine similarities of the k best rows, best first"""
+        query = self._normalize(np.asarray(query_vector, dtype=np.float32))
+        similarities = self.matrix @ query
+        k = min(k, len(similarities))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if k < len(similarities):
+            candidates = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            candidates = np.arange(len(similarities))
+        order = candidates[np.argsort(-similarities[candidates])]
+        return order, similarities[order]
+
+    @staticmethod
+    def _distance(similarity: float) -> float:
+        # Squared L2 distance between unit vectors, matching FAISS IndexFlatL2
+        return float(2.0 - 2.0 * similarity)
+
+    def similarity_search_with_score_by_vector(self, embedding: Any, k: int = 4) -> List[Tuple[Any, float]]:
+        order, similarities = self._top_k(embedding, k)
+        return [(self.documents[i], self._distance(s)) for i, s in zip(order, similarities)]
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Any]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k)]
+
+    def max_marginal_relevance_search_with_score_by_vector(self, embedding: Any, *, k: int = 4,
+                                                           fetch_k: int = 20, lambda_mult: float = 0.5,
+                                                           filter: Optional[dict] = None) -> List[Tuple[Any, float]]:
+        """MMR re-ranking of the fetch_k nearest rows"""
+        order, similarities = self._top_k(embedding, max(k, fetch_k))
+        if filter:
+            keep = [i for i, row in enumerate(order)
+                    if all(self.documents[row].metadata.get(key) == value for key, value in filter.items())]
+            order, similarities = order[keep], similarities[keep]
+        if len(order) == 0:
+            return []
+
+        candidates = self.matrix[order]
+        selected = [0]
+        # Highest similarity of each candidate to anything already selected
+        redundancy = candidates @ candidates[0]
+        while len(selected) < min(k, len(order)):
+            scores = lambda_mult * similarities - (1.0 - lambda_mult) * redundancy
+            scores[selected] = -np.inf
+            best = int(np.argmax(scores))
+            selected.append(best)
+            redundancy = np.maximum(redundancy, candidates @ candidates[best])
+
+        return [(self.documents[order[i]], self._distance(similarities[i])) for i in selected]